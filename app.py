@@ -1,15 +1,24 @@
 import os
 import logging
 from dotenv import load_dotenv
+from fastapi import HTTPException
+from fastapi.responses import PlainTextResponse
 from sentient_agent_framework import DefaultServer
 from github_agent.agent import GitHubSummaryAgent
 from github_agent.identity import AGENT_DID
-from github_agent.utils.execution_logger import ExecutionLogger
+from github_agent.utils.sessions import SessionLogs
+from github_agent.utils.admission import AdmissionController, AdmissionMiddleware
+from github_agent.utils import metrics
+from github_agent.utils.workers import run_workers, read_health, worker_id
+from github_agent.utils.proofs import ProofStore
+from github_agent.utils.blob_store import BlobStore
+from github_agent.utils.ipfs_publisher import IpfsPublisher
+from github_agent.utils.trace_index import TraceIndex
 
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
+    format="%(asctime)s [%(levelname)s] [%(process)d] %(message)s",
     handlers=[
         logging.StreamHandler(),
         logging.FileHandler("agent.log")
@@ -17,30 +26,90 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+async def metrics_endpoint():
+    return PlainTextResponse(metrics.render(),
+                             media_type="text/plain; version=0.0.4")
+
+async def health_endpoint():
+    return {"worker": worker_id(), "pid": os.getpid(), "pool": read_health()}
+
+proofs_dir = os.getenv("PROOFS_DIR", "proofs")
+proof_store = ProofStore(proofs_dir)
+# one content-addressed payload store shared by every logger in the process
+blob_threshold = int(os.getenv("BLOB_THRESHOLD", 4096))
+
+async def proof_endpoint(session: str, index: int):
+    try:
+        return proof_store.prove(session, index)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="unknown session")
+    except IndexError:
+        raise HTTPException(status_code=404, detail="entry out of range")
+
+def build_server(wid: int | None = None) -> DefaultServer:
+    # durable upload queue; each worker owns its own queue directory
+    publisher = None
+    if os.getenv("IPFS_PUBLISH", "0") == "1":
+        queue_dir = "proofs/.publish" + ("" if wid is None else f"/w{wid}")
+        publisher = IpfsPublisher(queue_dir=queue_dir)
+
+    def publish_epoch(checkpoint, path):
+        # each sealed epoch is pinned on its own, long before finalize()
+        if publisher is not None:
+            publisher.submit([path], kind="add",
+                             record=path.with_suffix(".cids.json"))
+
+    # One execution log per session under proofs/<session>/; each worker
+    # seals its own window roots
+    sessions = SessionLogs(
+        AGENT_DID, root=proofs_dir,
+        window=float(os.getenv("ROOT_WINDOW", 300)), worker=wid,
+        stream=os.getenv("TRACE_STREAM", "0") == "1",
+        durability=os.getenv("TRACE_DURABILITY", "batch"),
+        background=os.getenv("TRACE_BACKGROUND", "0") == "1",
+        blobs=BlobStore(root=f"{proofs_dir}/blobs", threshold=blob_threshold)
+        if blob_threshold else None,
+        compress=os.getenv("TRACE_COMPRESS", "0") == "1",
+        publisher=publisher,
+        epoch_entries=int(os.getenv("EPOCH_ENTRIES", 0)),
+        epoch_seconds=float(os.getenv("EPOCH_SECONDS", 0)),
+        on_epoch=publish_epoch,
+        # one SQLite index shared by all sessions (and workers, via WAL)
+        index=TraceIndex(f"{proofs_dir}/trace_index.sqlite")
+        if os.getenv("TRACE_INDEX", "0") == "1" else None)
+
+    # Initialize the agent with per-session execution logs
+    agent = GitHubSummaryAgent(sessions=sessions)
+
+    server = DefaultServer(agent)
+    # shed load at the door instead of queueing on OpenAI/GitHub
+    server._app.add_middleware(AdmissionMiddleware,
+                               controller=AdmissionController.from_env())
+    server._app.get("/metrics")(metrics_endpoint)
+    server._app.get("/health")(health_endpoint)
+    server._app.get("/proof/{session}/{index}")(proof_endpoint)
+    return server
+
 def main():
     try:
         # Load environment variables
         load_dotenv()
-        
-        # Initialize execution logger
-        execution_logger = ExecutionLogger()
         logger.info(f"Starting GitHub Summary Agent with DID: {AGENT_DID}")
-        
-        # Initialize the agent with execution logger
-        agent = GitHubSummaryAgent(
-            execution_logger=execution_logger
-        )
-        
+
         # Get port from environment variable or use default
         port = int(os.getenv("PORT", 8000))
         host = os.getenv("HOST", "0.0.0.0")
-        
-        logger.info(f"Agent server starting on {host}:{port}")
-        
+        workers = int(os.getenv("WORKERS", 1))
+
+        logger.info(f"Agent server starting on {host}:{port} ({workers} worker(s))")
+
         # Start the server
-        server = DefaultServer(agent)
-        server.run(host=host, port=port)
-        
+        if workers > 1:
+            run_workers(lambda wid: build_server(wid)._app, host, port, workers)
+        else:
+            server = build_server()
+            server.run(host=host, port=port)
+
     except Exception as e:
         logger.error(f"Failed to start agent server: {str(e)}", exc_info=True)
         raise
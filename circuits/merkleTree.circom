@@ -1,20 +1,53 @@
 pragma circom 2.2.2;
 
 include "circomlib/circuits/poseidon.circom";
+include "circomlib/circuits/comparators.circom";
 
-template Merkle4() {
-    signal input leaf[4];
-    // level 1
-    component h0 = Poseidon(2);
-    component h1 = Poseidon(2);
-    h0.inputs[0] <== leaf[0];  h0.inputs[1] <== leaf[1];
-    h1.inputs[0] <== leaf[2];  h1.inputs[1] <== leaf[3];
-    // level 2
-    component h2 = Poseidon(2);
-    h2.inputs[0] <== h0.out;   // Changed from h0.output to h0.out
-    h2.inputs[1] <== h1.out;   // Changed from h1.output to h1.out
+// Poseidon Merkle tree over 2**depth leaves, of which the first `count`
+// are real and the rest must be 0 (padding). No `main` here: per-depth
+// main files are generated by github_agent/zk/circuits.py, e.g.
+//
+//   component main {public [count]} = MerkleTree(12);
+//
+// Public signals: [root, count]. With count = 4, MerkleTree(2) gives the
+// same root as the old fixed Merkle4.
+template MerkleTree(depth) {
+    var n = 1 << depth;
+    signal input leaf[n];
+    signal input count;
     signal output root;
-    root <== h2.out;           // Changed from h2.output to h2.out
-}
 
-component main = Merkle4();
+    // past[i] = 1 iff i >= count; exactly one i in 0..n equals count,
+    // which also bounds count <= n
+    component eq[n + 1];
+    signal past[n + 1];
+    for (var i = 0; i <= n; i++) {
+        eq[i] = IsEqual();
+        eq[i].in[0] <== i;
+        eq[i].in[1] <== count;
+        if (i == 0) {
+            past[i] <== eq[i].out;
+        } else {
+            past[i] <== past[i - 1] + eq[i].out;
+        }
+    }
+    past[n] === 1;
+    for (var i = 0; i < n; i++) {
+        leaf[i] * past[i] === 0;
+    }
+
+    // heap layout: node[0] is the root, leaves at n-1 .. 2n-2
+    signal node[2 * n - 1];
+    for (var i = 0; i < n; i++) {
+        node[n - 1 + i] <== leaf[i];
+    }
+    component h[n - 1];
+    for (var j = 0; j < n - 1; j++) {
+        var k = n - 2 - j;
+        h[k] = Poseidon(2);
+        h[k].inputs[0] <== node[2 * k + 1];
+        h[k].inputs[1] <== node[2 * k + 2];
+        node[k] <== h[k].out;
+    }
+    root <== node[0];
+}
@@ -10,6 +10,9 @@ from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain.embeddings.openai import OpenAIEmbeddings
 from langchain.vectorstores.faiss import FAISS
 
+from github_agent.utils.instrument import TracedEmbeddings, traced
+from github_agent.utils.metrics import stage
+
 class IndexReadmes(Action):
     name = "index_readmes"
 
@@ -18,11 +21,16 @@ class IndexReadmes(Action):
         self.store = store
         self.splitter = RecursiveCharacterTextSplitter(
             chunk_size=600, chunk_overlap=100)
-        self.embed = OpenAIEmbeddings()
+        self.embed = TracedEmbeddings(OpenAIEmbeddings())
 
+    @traced("index_readmes")
     async def _run(self, inputs):
         for item in inputs:
-            docs = self.splitter.create_documents([item.text])
-            vs = FAISS.from_documents(docs, self.embed)
+            with stage("split"):
+                texts = self.splitter.split_text(item.text)
+            with stage("embedding"):
+                vectors = self.embed.embed_documents(texts)
+            with stage("faiss"):
+                vs = FAISS.from_embeddings(list(zip(texts, vectors)), self.embed)
             self.store[f"vs:{item.payload['repo']}"] = vs
         return inputs
\ No newline at end of file
@@ -1,3 +1,5 @@
+import os
+import asyncio
 from sentient_agent_framework.interface.agent import AbstractAgent
 from sentient_agent_framework.interface.response_handler import ResponseHandler
 from langchain.text_splitter import RecursiveCharacterTextSplitter
@@ -7,27 +9,88 @@ from langchain.chat_models import ChatOpenAI
 from langchain.chains import RetrievalQA
 
 from github_agent.utils.github_readme import fetch_readme
+from github_agent.utils.instrument import (
+    ExecutionCallbackHandler, InstrumentedResponseHandler, TracedEmbeddings,
+    use_logger,
+)
+from github_agent.utils.map_reduce import MapReduceSummarizer, MAP_REDUCE_CHARS
+from github_agent.utils.metrics import stage, IN_PROGRESS
+from github_agent.utils.tokens import TokenLedger, count_tokens
+
+# README prefix used when the token budget forces the cheap path
+SHORT_README_CHARS = int(os.getenv("SHORT_README_CHARS", 12000))
 
 class GitHubSummaryAgent(AbstractAgent):
     name = "github_summary"
 
-    def __init__(self):
+    def __init__(self, sessions=None):
         super().__init__(self.name)
+        # SessionLogs: one execution log (and root) per assist() call
+        self.sessions = sessions
         self.splitter = RecursiveCharacterTextSplitter(
             chunk_size=600, chunk_overlap=100)
-        self.embed = OpenAIEmbeddings()
-        self.llm   = ChatOpenAI(model="gpt-4o-mini", temperature=0.3)
+        # both record into the session logger of the running assist()
+        self.embed = TracedEmbeddings(OpenAIEmbeddings())
+        self.llm   = ChatOpenAI(model="gpt-4o-mini", temperature=0.3,
+                                callbacks=[ExecutionCallbackHandler()])
+        self.summarizer = MapReduceSummarizer(self.llm)
 
     async def assist(self, session, query, rh: ResponseHandler):
-        urls = [u for u in query.prompt.split() if u.startswith("http")]
-        for url in urls:
+        ledger = TokenLedger()
+        log = self.sessions.open(session, query) if self.sessions else None
+        if log is not None:
+            rh = InstrumentedResponseHandler(rh, log)
+        try:
+            with use_logger(log), IN_PROGRESS.track(what="assist"), stage("assist"):
+                urls = [u for u in query.prompt.split() if u.startswith("http")]
+                for url in urls:
+                    with IN_PROGRESS.track(what="repo"):
+                        await self._summarize_repo(url, rh, ledger)
+                if log is not None:
+                    log.log_json("token_usage", ledger.to_json())
+                with stage("emit"):
+                    await rh.complete()
+        finally:
+            if log is not None:
+                # finalize writes the tree and publishes; keep it off the loop
+                await asyncio.to_thread(self.sessions.close, log)
+
+    async def _summarize_repo(self, url: str, rh: ResponseHandler,
+                              ledger: TokenLedger):
+        with stage("github"):
             repo, readme = fetch_readme(url)
-            docs = self.splitter.create_documents([readme])
-            vs   = FAISS.from_documents(docs, self.embed)
-            chain = RetrievalQA.from_chain_type(
-                self.llm, retriever=vs.as_retriever())
-            summary = chain.run(
-                "Provide a concise 5‑sentence overview of this repository."
-            )
+
+        map_reduce = len(readme) > MAP_REDUCE_CHARS
+        # rough upper bound: every README token is embedded or sent to the
+        # LLM once, plus the retrieved context and the answer
+        n = count_tokens(readme)
+        estimate = int(n * 1.3) + 1000 if map_reduce else int(n * 1.2) + 1000
+
+        if ledger.would_exceed(estimate):
+            summary = self.summarizer.cached(readme)
+            if summary is None:
+                with stage("short_readme"), ledger.llm(repo, "short_readme"):
+                    summary = await self.summarizer.summarize_head(
+                        readme, SHORT_README_CHARS)
+        elif map_reduce:
+            # too big for retrieval over a handful of chunks
+            with stage("map_reduce"), ledger.llm(repo, "map_reduce"):
+                summary = await self.summarizer.summarize(readme)
+        else:
+            with stage("split"):
+                texts = self.splitter.split_text(readme)
+            with stage("embedding"):
+                vectors = self.embed.embed_documents(texts)
+            ledger.embedding(repo, "embedding", texts)
+            with stage("faiss"):
+                vs = FAISS.from_embeddings(list(zip(texts, vectors)), self.embed)
+            with stage("llm"), ledger.llm(repo, "llm"):
+                chain = RetrievalQA.from_chain_type(
+                    self.llm, retriever=vs.as_retriever())
+                question = "Provide a concise 5‑sentence overview of this repository."
+                summary = chain.run(question)
+            # the retriever embeds the question too
+            ledger.embedding(repo, "llm", [question])
+            self.summarizer.remember(readme, summary)
+        with stage("emit"):
             await rh.emit_text_block(repo, summary)
-        await rh.complete()
\ No newline at end of file
@@ -12,9 +12,13 @@ def load_or_create_key():
     if KEY_PATH.exists():
         key_jwk = KEY_PATH.read_text()
     else:
-        # Create a new Ed25519 key
+        # Create a new Ed25519 key; O_EXCL so concurrent workers agree on one
         key_jwk = didkit.generate_ed25519_key()
-        KEY_PATH.write_text(key_jwk)
+        try:
+            with open(KEY_PATH, "x") as f:
+                f.write(key_jwk)
+        except FileExistsError:
+            key_jwk = KEY_PATH.read_text()
     # Derive a did:key from the JWK
     did = didkit.key_to_did("key", key_jwk)
     return did, key_jwk
@@ -2,6 +2,9 @@
 import os, requests
 from sentient_agent_framework.interface.tool import Tool, ToolIO
 
+from github_agent.utils.instrument import traced
+from github_agent.utils.metrics import stage
+
 class GitHubReadmeTool(Tool):
     """
     Input : a GitHub repo URL
@@ -9,6 +12,7 @@ class GitHubReadmeTool(Tool):
     """
     name = "github_readme"
 
+    @traced("github_readme")
     async def _run(self, inp: ToolIO) -> ToolIO:
         url = inp.text.strip().rstrip("/")
         owner, name = url.split("/")[-2:]
@@ -16,7 +20,8 @@ class GitHubReadmeTool(Tool):
         headers = {"Accept": "application/vnd.github.raw"}
         if tok := os.getenv("GH_TOKEN"):
             headers["Authorization"] = f"token {tok}"
-        res = requests.get(api, headers=headers, timeout=20)
+        with stage("github"):
+            res = requests.get(api, headers=headers, timeout=20)
         res.raise_for_status()
         return ToolIO(text=res.text,
                       payload={"repo": f"{owner}/{name}"})
\ No newline at end of file
@@ -0,0 +1,179 @@
+# github_agent/utils/admission.py
+import os, json, time, asyncio
+from collections import deque
+
+from github_agent.utils.metrics import Counter, Gauge, Histogram
+
+IN_FLIGHT   = Gauge("admission_in_flight", "Requests currently being served")
+QUEUE_DEPTH = Gauge("admission_queue_depth", "Requests waiting for a slot")
+WAIT_TIME   = Histogram("admission_wait_seconds",
+                        "Time spent waiting for admission")
+REJECTED    = Counter("admission_rejected_total",
+                      "Requests shed before reaching the agent", ("reason",))
+
+
+class Rejected(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Front-door limiter for /assist: at most `max_concurrent` requests run at
+    once and at most `per_session` per session. Others wait in a bounded FIFO
+    for up to `queue_timeout` seconds; when the queue is full they are
+    rejected immediately.
+    """
+
+    def __init__(self, max_concurrent: int = 16, per_session: int = 2,
+                 max_queue: int = 64, queue_timeout: float = 15.0,
+                 retry_after: int = 2):
+        self.max_concurrent = max_concurrent
+        self.per_session = per_session
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.active = 0
+        self.sessions: dict[str, int] = {}
+        self.waiters: deque = deque()
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        return cls(
+            max_concurrent=int(os.getenv("ADMIT_MAX_CONCURRENT", 16)),
+            per_session=int(os.getenv("ADMIT_PER_SESSION", 2)),
+            max_queue=int(os.getenv("ADMIT_MAX_QUEUE", 64)),
+            queue_timeout=float(os.getenv("ADMIT_QUEUE_TIMEOUT", 15)),
+            retry_after=int(os.getenv("ADMIT_RETRY_AFTER", 2)),
+        )
+
+    def _can_run(self, session: str) -> bool:
+        return (self.active < self.max_concurrent
+                and self.sessions.get(session, 0) < self.per_session)
+
+    def _admit(self, session: str):
+        self.active += 1
+        self.sessions[session] = self.sessions.get(session, 0) + 1
+        IN_FLIGHT.set(self.active)
+
+    def _eligible_waiter(self) -> bool:
+        # waiters held back only by their own per-session cap don't block
+        # newcomers from other sessions (same test as the release loop)
+        return any(self._can_run(s) for s, _ in self.waiters)
+
+    async def acquire(self, session: str):
+        if self._can_run(session) and not self._eligible_waiter():
+            self._admit(session)
+            WAIT_TIME.observe(0.0)
+            return
+        if len(self.waiters) >= self.max_queue:
+            REJECTED.inc(reason="queue_full")
+            raise Rejected("queue_full", self.retry_after)
+
+        fut = asyncio.get_running_loop().create_future()
+        waiter = (session, fut)
+        self.waiters.append(waiter)
+        QUEUE_DEPTH.set(len(self.waiters))
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(fut), self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if fut.done():
+                # admitted in the same tick we gave up
+                self.release(session)
+            else:
+                self.waiters.remove(waiter)
+                fut.cancel()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            REJECTED.inc(reason="timeout")
+            raise Rejected("timeout", self.retry_after)
+        finally:
+            QUEUE_DEPTH.set(len(self.waiters))
+        WAIT_TIME.observe(time.perf_counter() - start)
+
+    def release(self, session: str):
+        self.active -= 1
+        left = self.sessions.get(session, 1) - 1
+        if left:
+            self.sessions[session] = left
+        else:
+            self.sessions.pop(session, None)
+        # hand freed slots to the oldest waiters whose session has room
+        for waiter in list(self.waiters):
+            if self.active >= self.max_concurrent:
+                break
+            s, fut = waiter
+            if self._can_run(s):
+                self.waiters.remove(waiter)
+                self._admit(s)
+                fut.set_result(None)
+        IN_FLIGHT.set(self.active)
+        QUEUE_DEPTH.set(len(self.waiters))
+
+
+def _session_key(body: bytes, scope) -> str:
+    try:
+        session = json.loads(body).get("session") or {}
+        key = session.get("activity_id") or session.get("processor_id")
+    except (ValueError, AttributeError):
+        key = None
+    if key:
+        return str(key)
+    client = scope.get("client") or ("anonymous",)
+    return str(client[0])
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware that runs `AdmissionController` in front of `paths`.
+    The request body is buffered once to read the session id, then replayed
+    to the wrapped app.
+    """
+
+    def __init__(self, app, controller: AdmissionController,
+                 paths: tuple = ("/assist",)):
+        self.app = app
+        self.controller = controller
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            return await self.app(scope, receive, send)
+
+        chunks, more = [], True
+        while more:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            more = message.get("more_body", False)
+        body = b"".join(chunks)
+        session = _session_key(body, scope)
+
+        try:
+            await self.controller.acquire(session)
+        except Rejected as e:
+            payload = json.dumps({"error": "overloaded",
+                                  "reason": e.reason}).encode()
+            await send({"type": "http.response.start", "status": 429,
+                        "headers": [(b"content-type", b"application/json"),
+                                    (b"retry-after", str(e.retry_after).encode())]})
+            await send({"type": "http.response.body", "body": payload})
+            return
+
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        try:
+            await self.app(scope, replay, send)
+        finally:
+            self.controller.release(session)
@@ -0,0 +1,313 @@
+# github_agent/utils/audit.py
+import io, os, re, json, asyncio, hashlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+
+from github_agent.utils.blob_store import is_ref, ref_digest
+from github_agent.utils.merkle import MerkleAccumulator
+from github_agent.utils.proofs import entry_digest
+from github_agent.utils.unixfs import FileBuilder, decode_links, parse_cid
+
+# End-to-end check of a finalized session, used by scripts/verify_execution.py.
+# Traces are read as a stream (local directory or a UnixFS directory CID
+# behind any trustless gateway), entries are rehashed in worker processes
+# in bounded batches and the Merkle root is rebuilt with a frontier-only
+# accumulator, so memory does not grow with the trace.
+
+GATEWAY = os.getenv("IPFS_GATEWAY", "https://ipfs.io")
+TRACE_RE = re.compile(r"^execution_trace(-\d{5}\.jsonl(\.zst)?|\.json)$")
+READ_SIZE = 1 << 20
+
+
+class Mismatch(Exception):
+    """First point where the published artifacts disagree."""
+
+
+class LocalSource:
+    """
+    A session directory. Blobs are looked up next to the trace first (an
+    unpacked CAR), then in the shared store, by default <dir>/../blobs.
+    """
+
+    def __init__(self, directory, blobs=None):
+        self.dir = Path(directory)
+        self.blobs = Path(blobs) if blobs else self.dir.parent / "blobs"
+
+    def names(self) -> list[str]:
+        return sorted(os.listdir(self.dir))
+
+    def open(self, name: str):
+        return open(self.dir / name, "rb")
+
+    def open_blob(self, digest: str):
+        path = self.dir / digest
+        if not path.exists():
+            path = self.blobs / digest[:2] / digest
+        try:
+            return open(path, "rb")
+        except FileNotFoundError:
+            raise Mismatch(f"blob {digest} is missing") from None
+
+
+class _VerifiedReader(io.RawIOBase):
+    """Streams a gateway response and checks its UnixFS CID at EOF."""
+
+    def __init__(self, name: str, chunks, cid: bytes):
+        self.name, self.chunks, self.cid = name, chunks, cid
+        self.builder = FileBuilder()
+        self.buf = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, out) -> int:
+        while not self.buf:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                if self.builder is not None:
+                    cid, _ = self.builder.finish()
+                    self.builder = None
+                    if cid != self.cid:
+                        raise Mismatch(f"{self.name} does not match its CID")
+                return 0
+            self.builder.write(chunk)
+            self.buf = chunk
+        n = min(len(out), len(self.buf))
+        out[:n] = self.buf[:n]
+        self.buf = self.buf[n:]
+        return n
+
+
+class CidSource:
+    """
+    Files of a UnixFS directory fetched from an HTTP gateway. The directory
+    block is fetched raw and hash-checked, every file is checked against
+    its link's CID as it streams, so the gateway does not need to be trusted.
+    """
+
+    def __init__(self, cid: str, gateway: str = GATEWAY, session=None):
+        import requests
+        self.http = session or requests.Session()
+        self.gateway = gateway.rstrip("/")
+        self.cid = cid
+        res = self.http.get(f"{self.gateway}/ipfs/{cid}", timeout=60,
+                            params={"format": "raw"},
+                            headers={"Accept": "application/vnd.ipld.raw"})
+        res.raise_for_status()
+        if hashlib.sha256(res.content).digest() != parse_cid(cid)[-32:]:
+            raise Mismatch(f"directory block does not match {cid}")
+        self.links = {name: link for name, link, _ in decode_links(res.content)}
+
+    def names(self) -> list[str]:
+        return sorted(self.links)
+
+    def open(self, name: str):
+        res = self.http.get(f"{self.gateway}/ipfs/{self.cid}/{name}",
+                            stream=True, timeout=60)
+        res.raise_for_status()
+        return io.BufferedReader(_VerifiedReader(
+            name, res.iter_content(READ_SIZE), self.links[name]), READ_SIZE)
+
+    def open_blob(self, digest: str):
+        # the CAR carries each referenced blob under its digest
+        if digest not in self.links:
+            raise Mismatch(f"blob {digest} is missing")
+        return self.open(digest)
+
+
+def _chunks(f):
+    return iter(lambda: f.read(READ_SIZE), b"")
+
+
+def _lines(chunks):
+    rest = b""
+    for chunk in chunks:
+        lines = (rest + chunk).split(b"\n")
+        rest = lines.pop()
+        yield from (line for line in lines if line.strip())
+    if rest.strip():
+        yield rest
+
+
+_SPECIAL = re.compile(rb'[\[\]{}"\\]')
+
+
+def _json_array(chunks):
+    """
+    Raw bytes of each element of a top-level JSON array of objects. Only
+    brackets, quotes and escapes are looked at; parsing is left to workers.
+    """
+    buf, pos, depth, in_str, start = bytearray(), 0, 0, False, -1
+    for chunk in chunks:
+        buf += chunk
+        while (m := _SPECIAL.search(buf, pos)) is not None:
+            i, c = m.start(), buf[m.start()]
+            if in_str:
+                if c == 0x5C:               # backslash: skip the next byte
+                    if i + 1 == len(buf):
+                        break
+                    pos = i + 2
+                    continue
+                in_str = c != 0x22
+            elif c == 0x22:
+                in_str = True
+            elif c in b"[{":
+                depth += 1
+                if depth == 2:
+                    start = i
+            else:
+                if depth == 2:
+                    yield bytes(buf[start:i + 1])
+                    start = -1
+                depth -= 1
+            pos = i + 1
+        else:
+            pos = len(buf)
+        keep = start if start >= 0 else pos
+        del buf[:keep]
+        pos -= keep
+        start = start - keep if start >= 0 else -1
+
+
+def iter_entries(source):
+    """Raw JSON text of every entry, in log order."""
+    names = [n for n in source.names() if TRACE_RE.match(n)]
+    if not names:
+        raise Mismatch("no execution trace found")
+    for name in names:
+        with source.open(name) as f:
+            if name.endswith(".json"):
+                yield from _json_array(_chunks(f))
+            elif name.endswith(".zst"):
+                import zstandard
+                reader = zstandard.ZstdDecompressor().stream_reader(
+                    f, read_across_frames=True)
+                yield from _lines(_chunks(reader))
+            else:
+                yield from _lines(_chunks(f))
+
+
+def _refs(obj, out: set):
+    if is_ref(obj):
+        out.add(ref_digest(obj))
+    elif isinstance(obj, dict):
+        for v in obj.values():
+            _refs(v, out)
+    elif isinstance(obj, list):
+        for v in obj:
+            _refs(v, out)
+
+
+def _hash_batch(raw: list[bytes]) -> tuple[bytes, set, tuple | None]:
+    digests, refs = bytearray(), set()
+    for k, line in enumerate(raw):
+        entry = json.loads(line)
+        digest = entry_digest(entry)
+        if entry.get("hash", digest) != digest:
+            return bytes(digests), refs, (k, entry.get("hash"), digest, entry)
+        digests += bytes.fromhex(digest)
+        _refs(entry, refs)
+    return bytes(digests), refs, None
+
+
+def rehash(entries, workers: int | None = None, batch: int = 2048) -> dict:
+    """
+    Rehashes `entries` (raw JSON texts) in a process pool and folds the
+    digests into a root. At most 2 * workers batches are in flight.
+    Raises Mismatch at the first entry whose recorded hash is wrong.
+    Also returns the digests of every blob the entries reference.
+    """
+    workers = workers or os.cpu_count() or 1
+    acc = MerkleAccumulator(keep_levels=False)
+    blobs = set()
+    entries = iter(entries)
+    with ProcessPoolExecutor(workers) as pool:
+        pending = deque()
+
+        def collect():
+            digests, refs, bad = pending.popleft().result()
+            blobs.update(refs)
+            for i in range(0, len(digests), 32):
+                acc.append(digests[i:i + 32])
+            if bad is not None:
+                k, recorded, computed, entry = bad
+                for f in pending:
+                    f.cancel()
+                raise Mismatch(
+                    f"entry {acc.count} ({entry.get('type')} at "
+                    f"{entry.get('timestamp')}): recorded hash {recorded}, "
+                    f"recomputed {computed}")
+
+        while chunk := list(islice(entries, batch)):
+            pending.append(pool.submit(_hash_batch, chunk))
+            if len(pending) >= 2 * workers:
+                collect()
+        while pending:
+            collect()
+    return {"count": acc.count, "root": acc.root_hex(), "blobs": sorted(blobs)}
+
+
+def read_json(source, name: str) -> dict:
+    with source.open(name) as f:
+        return json.loads(f.read())
+
+
+def _hex(value: str) -> str:
+    return value.lower().removeprefix("0x")
+
+
+def check_tree(source, rebuilt: dict) -> str:
+    tree = read_json(source, "execution_tree.json")
+    if tree.get("leaf_count", rebuilt["count"]) != rebuilt["count"]:
+        raise Mismatch(f"trace has {rebuilt['count']} entries, tree says "
+                       f"{tree['leaf_count']}")
+    if _hex(tree["root"] or "") != (rebuilt["root"] or ""):
+        raise Mismatch(f"rebuilt root {rebuilt['root']} != published "
+                       f"{tree['root']}")
+    check_blobs(source, rebuilt.get("blobs", ()))
+    return rebuilt["root"]
+
+
+def check_blobs(source, digests):
+    """
+    Entry hashes only cover the {"$blob": ...} references, so every
+    referenced blob must also hash to its digest.
+    """
+    for digest in digests:
+        h = hashlib.sha256()
+        with source.open_blob(digest) as f:
+            for chunk in _chunks(f):
+                h.update(chunk)
+        if h.hexdigest() != digest:
+            raise Mismatch(f"blob {digest} does not match its digest")
+
+
+def check_credential(cred: dict, root: str) -> str:
+    """Subject must be `root` and didkit must accept the proof; returns the issuer."""
+    import didkit
+    subject = cred.get("credentialSubject", {}).get("executionRoot", "")
+    if _hex(subject) != root:
+        raise Mismatch(f"credential commits to {subject}, trace root is {root}")
+    result = json.loads(asyncio.run(didkit.verify_credential(
+        json.dumps(cred), json.dumps({"proofPurpose": "assertionMethod"}))))
+    if result.get("errors"):
+        raise Mismatch(f"credential proof invalid: {result['errors']}")
+    issuer = cred["issuer"]
+    return issuer["id"] if isinstance(issuer, dict) else issuer
+
+
+def check_chain(did: str, root: str, rpc_url: str, registry: str,
+                abi_path="artifacts/contracts/IdentityRegistry.sol/IdentityRegistry.json"):
+    """IdentityRegistry.claims(keccak(did)) must hold topic "executionRoot" = root."""
+    from web3 import Web3
+    w3 = Web3(Web3.HTTPProvider(rpc_url))
+    abi = json.load(open(abi_path))["abi"]
+    reg = w3.eth.contract(address=registry, abi=abi)
+    topic, data, issuer, ts = reg.functions.claims(w3.keccak(text=did)).call()
+    if topic != w3.keccak(text="executionRoot"):
+        raise Mismatch(f"latest on-chain claim for {did} is not an executionRoot")
+    if bytes(data).hex() != root:
+        raise Mismatch(f"on-chain executionRoot {bytes(data).hex()} != {root}")
+    return {"issuer": issuer, "timestamp": ts}
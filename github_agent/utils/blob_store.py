@@ -0,0 +1,111 @@
+# github_agent/utils/blob_store.py
+import os, hashlib, threading
+from pathlib import Path
+from collections import OrderedDict
+
+BLOB_KEY = "$blob"
+
+
+def is_ref(obj) -> bool:
+    """True for a reference made by externalize() (user keys are escaped)."""
+    return (isinstance(obj, dict) and set(obj) == {BLOB_KEY, "size"}
+            and isinstance(obj[BLOB_KEY], str)
+            and obj[BLOB_KEY].startswith("sha256:"))
+
+
+def ref_digest(ref: dict) -> str:
+    return ref[BLOB_KEY].split(":", 1)[1]
+
+
+def _is_blob_key(key) -> bool:
+    return isinstance(key, str) and key[:1] == "$" and key.lstrip("$") == "blob"
+
+
+def _escape(key):
+    # user keys "$blob", "$$blob", ... gain a "$", so only references
+    # carry BLOB_KEY itself
+    return "$" + key if _is_blob_key(key) else key
+
+
+def _unescape(key):
+    return key[1:] if _is_blob_key(key) and key != BLOB_KEY else key
+
+
+class BlobStore:
+    """
+    Content-addressed store for large payload strings, shared by every
+    session: each distinct content is written once to
+    <root>/<first two hex>/<sha256 hex>. Entries keep a reference
+    {"$blob": "sha256:<hex>", "size": <bytes>} instead of the text; since
+    the reference is part of the entry hash, the trace stays verifiable.
+    A "$blob" key in logged data is stored as "$$blob" (and so on), so it
+    is never mistaken for a reference.
+    """
+
+    def __init__(self, root="proofs/blobs", threshold: int = 4096,
+                 memo_size: int = 64):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.threshold = threshold
+        self.known: set[str] = set()
+        # id(str) -> (str, reference); holding the str keeps its id unique, so
+        # logging the same object again costs no rehash at all
+        self.memo: OrderedDict = OrderedDict()
+        self.memo_size = memo_size
+        self.lock = threading.Lock()
+
+    def path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def put(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        if digest in self.known:
+            return digest
+        path = self.path(digest)
+        if not path.exists():
+            path.parent.mkdir(exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        self.known.add(digest)
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        data = self.path(digest).read_bytes()
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"blob {digest} is corrupt")
+        return data
+
+    def _ref(self, text: str) -> dict:
+        with self.lock:
+            hit = self.memo.get(id(text))
+            if hit is not None and hit[0] is text:
+                self.memo.move_to_end(id(text))
+                return dict(hit[1])
+        data = text.encode()
+        ref = {BLOB_KEY: "sha256:" + self.put(data), "size": len(data)}
+        with self.lock:
+            self.memo[id(text)] = (text, ref)
+            if len(self.memo) > self.memo_size:
+                self.memo.popitem(last=False)
+        return dict(ref)
+
+    def externalize(self, obj):
+        """Copy of `obj` with every string of >= threshold chars replaced by a reference."""
+        if isinstance(obj, str):
+            return self._ref(obj) if len(obj) >= self.threshold else obj
+        if isinstance(obj, dict):
+            return {_escape(k): self.externalize(v) for k, v in obj.items()}
+        if isinstance(obj, (list, tuple)):
+            return [self.externalize(v) for v in obj]
+        return obj
+
+    def expand(self, obj):
+        """Inverse of externalize(): inlines referenced blobs again."""
+        if is_ref(obj):
+            return self.get(ref_digest(obj)).decode()
+        if isinstance(obj, dict):
+            return {_unescape(k): self.expand(v) for k, v in obj.items()}
+        if isinstance(obj, list):
+            return [self.expand(v) for v in obj]
+        return obj
@@ -0,0 +1,176 @@
+# github_agent/utils/canonical.py
+import math
+from json.encoder import encode_basestring as _c_string  # C-accelerated
+
+# RFC 8785 JSON Canonicalization Scheme (JCS): no whitespace, object keys
+# sorted by UTF-16 code units, strings with the minimal escapes of
+# ECMAScript JSON.stringify, numbers in ECMAScript Number.toString form.
+# Only JSON types are accepted (no default= hook); NaN/Infinity and
+# integers beyond 2^53 are rejected as in I-JSON.
+
+# Stored as entry["canon"] so verifiers know how each hash was produced.
+# Entries without the field were hashed with json.dumps(sort_keys=True).
+CANON_VERSION = "jcs"
+
+MAX_SAFE_INT = 2 ** 53
+
+
+def _key_order(keys):
+    if all(k.isascii() for k in keys):
+        return sorted(keys)
+    return sorted(keys, key=lambda k: k.encode("utf-16-be"))
+
+
+def _key(k) -> str:
+    # non-str keys are coerced the way json.dumps does
+    if isinstance(k, str):
+        return k
+    if k is None or isinstance(k, bool):
+        return "null" if k is None else ("true" if k else "false")
+    if isinstance(k, int):
+        return str(k)
+    if isinstance(k, float):
+        return _number(k)
+    raise TypeError(f"object keys must be str, int, float, bool or None, "
+                    f"not {type(k).__name__}")
+
+
+def _members(obj: dict) -> dict:
+    if all(isinstance(k, str) for k in obj):
+        return obj
+    members = {}
+    for k, v in obj.items():
+        key = _key(k)
+        if key in members:
+            raise ValueError(f"duplicate object key {key!r} after coercion")
+        members[key] = v
+    return members
+
+
+def _number(f: float) -> str:
+    if math.isnan(f) or math.isinf(f):
+        raise ValueError("NaN and Infinity are not valid JSON numbers")
+    if f == 0:
+        return "0"
+    sign = "-" if f < 0 else ""
+    mantissa, _, exp = repr(abs(f)).partition("e")
+    whole, _, frac = mantissa.partition(".")
+    e = int(exp or 0)
+    if whole != "0":
+        n = len(whole) + e
+        digits = (whole + frac).rstrip("0")
+    else:
+        stripped = frac.lstrip("0")
+        n = e - (len(frac) - len(stripped))
+        digits = stripped.rstrip("0")
+    # value = 0.<digits> * 10^n, formatted as ECMAScript Number::toString
+    k = len(digits)
+    if k <= n <= 21:
+        out = digits + "0" * (n - k)
+    elif 0 < n <= 21:
+        out = digits[:n] + "." + digits[n:]
+    elif -6 < n <= 0:
+        out = "0." + "0" * -n + digits
+    else:
+        e = n - 1
+        head = digits[0] + ("." + digits[1:] if k > 1 else "")
+        out = f"{head}e{'+' if e >= 0 else '-'}{abs(e)}"
+    return sign + out
+
+
+def _encode(obj, out):
+    if isinstance(obj, str):
+        out(_c_string(obj))
+    elif obj is None:
+        out("null")
+    elif obj is True:
+        out("true")
+    elif obj is False:
+        out("false")
+    elif isinstance(obj, int):
+        if abs(obj) > MAX_SAFE_INT:
+            raise ValueError(f"integer {obj} is outside the I-JSON range")
+        out(str(obj))
+    elif isinstance(obj, float):
+        out(_number(obj))
+    elif isinstance(obj, dict):
+        obj = _members(obj)
+        out("{")
+        first = True
+        for k in _key_order(list(obj)):
+            if not first:
+                out(",")
+            first = False
+            out(_c_string(k))
+            out(":")
+            _encode(obj[k], out)
+        out("}")
+    elif isinstance(obj, (list, tuple)):
+        out("[")
+        for i, v in enumerate(obj):
+            if i:
+                out(",")
+            _encode(v, out)
+        out("]")
+    else:
+        raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+def _pure(obj) -> bytes:
+    parts = []
+    _encode(obj, parts.append)
+    return "".join(parts).encode("utf-8")
+
+
+# Optional accelerated backend: orjson matches JCS for everything except
+# float formatting and non-BMP key order, so it is only used for values
+# without floats and with BMP-only keys, and only if it passes a self-check.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _orjson_safe(obj) -> bool:
+    stack = [obj]
+    while stack:
+        v = stack.pop()
+        if isinstance(v, str) or v is None or isinstance(v, bool):
+            continue
+        if isinstance(v, int):
+            if abs(v) > MAX_SAFE_INT:
+                return False
+        elif isinstance(v, dict):
+            for k in v:
+                if not isinstance(k, str) or any(ord(c) > 0xFFFF for c in k):
+                    return False
+            stack.extend(v.values())
+        elif isinstance(v, list):
+            stack.extend(v)
+        else:
+            return False   # floats, tuples, other types: pure path
+    return True
+
+
+if orjson is not None:
+    _probe = {"b": "".join(map(chr, range(0x80))) + "é 😀",
+              "a": [1, -MAX_SAFE_INT, None, True, {"é": "x", "z": ""}]}
+    if orjson.dumps(_probe, option=orjson.OPT_SORT_KEYS) != _pure(_probe):
+        orjson = None
+
+
+def canonicalize(obj) -> bytes:
+    """RFC 8785 canonical UTF-8 bytes of a JSON value."""
+    if orjson is not None and _orjson_safe(obj):
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+    return _pure(obj)
+
+
+def join_members(members: dict[str, bytes]) -> bytes:
+    """
+    Canonical object from already-canonical member values, so a large value
+    can be encoded once and reused in several objects (entry and stored line).
+    """
+    return b"{" + b",".join(
+        canonicalize(k) + b":" + members[k] for k in _key_order(list(members))
+    ) + b"}"
@@ -0,0 +1,72 @@
+# github_agent/utils/car.py
+import os, shutil, tempfile
+from pathlib import Path
+
+from github_agent.utils.unixfs import add_files, parse_cid, varint
+
+# CARv1 (https://ipld.io/specs/transport/car/carv1/): a varint-prefixed
+# dag-cbor header {"roots": [CID...], "version": 1} followed by
+# varint(len(cid) + len(block)) | cid | block for every block.
+
+
+def _cbor_bytes(major: int, data: bytes) -> bytes:
+    n = len(data)
+    if n < 24:
+        head = bytes((major << 5 | n,))
+    elif n < 256:
+        head = bytes((major << 5 | 24, n))
+    else:
+        head = bytes((major << 5 | 25,)) + n.to_bytes(2, "big")
+    return head + data
+
+
+def car_header(roots: list[bytes]) -> bytes:
+    # dag-cbor map, keys in length-first order: "roots" then "version";
+    # CIDs are tag 42 over 0x00 + binary CID
+    if len(roots) > 23:
+        raise ValueError("too many roots")
+    header = (b"\xa2" + _cbor_bytes(3, b"roots") + bytes((0x80 | len(roots),))
+              + b"".join(b"\xd8\x2a" + _cbor_bytes(2, b"\x00" + r) for r in roots)
+              + _cbor_bytes(3, b"version") + b"\x01")
+    return varint(len(header)) + header
+
+
+class CarWriter:
+    """
+    Collects blocks (use put() as the unixfs callback) and writes the CAR
+    once the roots are known. Blocks are spooled to a temporary file and
+    written once each.
+    """
+
+    def __init__(self):
+        self.body = tempfile.TemporaryFile()
+        self.seen: set[bytes] = set()
+
+    def put(self, cid: bytes, block: bytes):
+        if cid in self.seen:
+            return
+        self.seen.add(cid)
+        self.body.write(varint(len(cid) + len(block)) + cid + block)
+
+    def write(self, path, roots: list[bytes]) -> Path:
+        path = Path(path)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp, "wb") as f:
+            f.write(car_header(roots))
+            self.body.seek(0)
+            shutil.copyfileobj(self.body, f)
+        os.replace(tmp, path)
+        self.body.close()
+        return path
+
+
+def export_car(paths, car_path) -> dict[str, str]:
+    """
+    Imports `paths` as UnixFS (wrapped in one directory) into a CAR file
+    rooted at that directory; returns add_files()' CIDs.
+    """
+    car = CarWriter()
+    cids = add_files(paths, car.put, wrap=True)
+    car.write(car_path, [parse_cid(cids["directory"])])
+    return cids
+
@@ -0,0 +1,115 @@
+# github_agent/utils/entry_store.py
+import json
+from array import array
+from datetime import datetime, timedelta
+
+from github_agent.utils.canonical import CANON_VERSION, canonicalize, join_members
+
+# In-memory execution-log entries, stored by column:
+#
+#   ts        array('q')   nanoseconds since the Unix epoch (UTC)
+#   type_ids  array('B')   index into `types` (TEXT / JSON / ERROR ...)
+#   payloads  list[bytes]  canonical (JCS) payload, exactly as hashed
+#   digests   bytearray    raw 32-byte SHA-256 per entry
+#
+# Hex digests, ISO timestamps and dicts are only built when an entry is
+# read or serialized. Timestamps come from datetime (microseconds), so the
+# ISO string rebuilt from the nanosecond column is the one that was hashed.
+
+_EPOCH = datetime(1970, 1, 1)
+_CANON = canonicalize(CANON_VERSION)
+
+
+def to_ns(ts: datetime) -> int:
+    return (ts - _EPOCH) // timedelta(microseconds=1) * 1000
+
+
+def iso(ns: int) -> str:
+    return (_EPOCH + timedelta(microseconds=ns // 1000)).isoformat() + "Z"
+
+
+class Entry:
+    """One entry viewed as a record; to_dict() gives the logged JSON form."""
+
+    __slots__ = ("ts_ns", "type", "payload", "digest")
+
+    def __init__(self, ts_ns: int, type: str, payload: bytes, digest: bytes):
+        self.ts_ns, self.type, self.payload, self.digest = \
+            ts_ns, type, payload, digest
+
+    def members(self) -> dict[str, bytes]:
+        return {
+            "canon":     _CANON,
+            "timestamp": canonicalize(iso(self.ts_ns)),
+            "type":      canonicalize(self.type),
+            "payload":   self.payload,
+            "hash":      b'"%s"' % self.digest.hex().encode(),
+        }
+
+    def line(self) -> bytes:
+        """Canonical JSON of the entry including its hash (as streamed)."""
+        return join_members(self.members())
+
+    def to_dict(self) -> dict:
+        return {
+            "canon":     CANON_VERSION,
+            "timestamp": iso(self.ts_ns),
+            "type":      self.type,
+            "payload":   json.loads(self.payload),
+            "hash":      self.digest.hex(),
+        }
+
+
+class EntryColumns:
+    """List-like (len, [i], iteration yield dicts) columnar entry store."""
+
+    def __init__(self):
+        self.ts = array("q")
+        self.type_ids = array("B")
+        self.types: list[str] = []
+        self.type_index: dict[str, int] = {}
+        self.payloads: list[bytes] = []
+        self.digests = bytearray()
+
+    def append(self, ts_ns: int, event_type: str, payload: bytes, digest: bytes):
+        type_id = self.type_index.get(event_type)
+        if type_id is None:
+            type_id = self.type_index[event_type] = len(self.types)
+            self.types.append(event_type)
+        self.ts.append(ts_ns)
+        self.type_ids.append(type_id)
+        # exact-size copy: encoders may hand back over-allocated buffers
+        self.payloads.append(bytes(memoryview(payload)))
+        self.digests += digest
+
+    def __len__(self):
+        return len(self.ts)
+
+    def record(self, i: int) -> Entry:
+        i = range(len(self))[i]
+        return Entry(self.ts[i], self.types[self.type_ids[i]], self.payloads[i],
+                     bytes(self.digests[i * 32:(i + 1) * 32]))
+
+    def __getitem__(self, i: int) -> dict:
+        return self.record(i).to_dict()
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.record(i).to_dict()
+
+    def write_json(self, f, locations: list | None = None):
+        """
+        Writes the entries as a JSON array, one canonical entry per line;
+        appends (i, byte offset, length) per entry to `locations`.
+        """
+        f.write(b"[")
+        offset = 1
+        for i in range(len(self)):
+            line = self.record(i).line()
+            f.write(b"\n" if i == 0 else b",\n")
+            offset += 1 if i == 0 else 2
+            f.write(line)
+            if locations is not None:
+                locations.append((i, offset, len(line)))
+            offset += len(line)
+        f.write(b"\n]\n")
@@ -0,0 +1,124 @@
+# github_agent/utils/epochs.py
+import os, json, time, hashlib, logging, threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from github_agent.utils.canonical import canonicalize
+from github_agent.utils.merkle import MerkleAccumulator
+
+logger = logging.getLogger(__name__)
+
+# A checkpoint seals one epoch of a running execution log:
+#
+#   {"epoch": 3, "first": 3000, "count": 4000,
+#    "epoch_root": <root over entries first..count-1>,
+#    "root":       <root over entries 0..count-1, what finalize() would give>,
+#    "prev":       <sha256 of the previous checkpoint's JCS form>,
+#    "sealed_at":  <unix time>}
+#
+# Checkpoints are chained through "prev", so anchoring any one of them
+# commits to every earlier epoch as well.
+
+
+def checkpoint_digest(checkpoint: dict) -> str:
+    return hashlib.sha256(canonicalize(checkpoint)).hexdigest()
+
+
+class EpochSealer:
+    """
+    Seals an epoch every `entries` entries and/or `seconds` seconds (0 turns
+    a trigger off). add() and publish() run under the logger's lock and only
+    do O(log n) work; files are written and `on_epoch(checkpoint, path)` is
+    called in order on a separate thread, so recording never waits on them.
+    `flush(count)` makes the first `count` entries durable; it runs on the
+    checkpoint thread, before the checkpoint that covers them is written.
+    """
+
+    def __init__(self, lock: threading.Lock, tree: MerkleAccumulator,
+                 out_dir, entries: int = 0, seconds: float = 0,
+                 on_epoch=None, flush=None):
+        self.lock = lock
+        self.tree = tree
+        self.out_dir = Path(out_dir) / "checkpoints"
+        self.entries = entries
+        self.seconds = seconds
+        self.on_epoch = on_epoch
+        self.flush = flush
+        self.epoch = 0
+        self.acc = MerkleAccumulator(keep_levels=False)
+        self.started = None
+        self.prev = None
+        self.timer = None
+        self.paths: list[Path] = []
+        self.executor = ThreadPoolExecutor(max_workers=1,
+                                           thread_name_prefix="epochs")
+
+    def add(self, digest: bytes) -> dict | None:
+        """Caller holds `lock`. Returns a checkpoint if this sealed an epoch."""
+        self.acc.append(digest)
+        now = time.time()
+        if self.acc.count == 1:
+            self.started = now
+            if self.seconds:
+                self._arm(self.epoch)
+        if ((self.entries and self.acc.count >= self.entries)
+                or (self.seconds and now - self.started >= self.seconds)):
+            return self._seal()
+        return None
+
+    def _arm(self, epoch: int):
+        self.timer = threading.Timer(self.seconds, self._due, (epoch,))
+        self.timer.daemon = True
+        self.timer.start()
+
+    def _due(self, epoch: int):
+        # quiet period: seal what is there so it does not wait for traffic
+        with self.lock:
+            if self.epoch == epoch and self.acc.count:
+                self.publish(self._seal())
+
+    def _seal(self) -> dict:
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        checkpoint = {
+            "epoch": self.epoch,
+            "first": self.tree.count - self.acc.count,
+            "count": self.tree.count,
+            "epoch_root": self.acc.root_hex(),
+            "root": self.tree.root_hex(),
+            "prev": self.prev,
+            "sealed_at": round(time.time(), 3),
+        }
+        self.prev = checkpoint_digest(checkpoint)
+        self.epoch += 1
+        self.acc = MerkleAccumulator(keep_levels=False)
+        return checkpoint
+
+    def publish(self, checkpoint: dict):
+        """Caller holds `lock`, so checkpoints are queued in epoch order."""
+        self.executor.submit(self._write, checkpoint)
+
+    def _write(self, checkpoint: dict):
+        if self.flush is not None:
+            # never anchor entries that could still be lost in a crash
+            self.flush(checkpoint["count"])
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        path = self.out_dir / f"epoch-{checkpoint['epoch']:05d}.json"
+        tmp = path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(checkpoint, indent=2))
+        os.replace(tmp, path)
+        self.paths.append(path)
+        if self.on_epoch is not None:
+            try:
+                self.on_epoch(checkpoint, path)
+            except Exception:
+                logger.exception(f"on_epoch hook failed for epoch {checkpoint['epoch']}")
+
+    def close(self) -> list[Path]:
+        """Seals the open epoch and waits for every checkpoint to be written."""
+        with self.lock:
+            if self.acc.count:
+                self.publish(self._seal())
+        self.executor.shutdown(wait=True)
+        return self.paths
@@ -1,23 +1,144 @@
-import json, hashlib
+import json, queue, hashlib, itertools, threading
 from datetime import datetime
-from merkletools import MerkleTools
-import ipfshttpclient
+from pathlib import Path
+
+from github_agent.utils.blob_store import is_ref, ref_digest
+from github_agent.utils.car import export_car
+from github_agent.utils.canonical import canonicalize, join_members, CANON_VERSION
+from github_agent.utils.entry_store import EntryColumns, to_ns
+from github_agent.utils.epochs import EpochSealer
+from github_agent.utils.merkle import MerkleAccumulator
+from github_agent.utils.merkle_store import write_tree, MerkleTreeFile
+from github_agent.utils.proofs import verify  # re-exported for auditors
+from github_agent.utils.trace_writer import JsonlTraceWriter
+from github_agent.utils.trace_segments import ZstdTraceWriter
+
+def _freeze(obj):
+    """Snapshot of a payload: containers are copied, scalars shared."""
+    if isinstance(obj, dict):
+        return {k: _freeze(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_freeze(v) for v in obj]
+    return obj
 
 class ExecutionLogger:
-    def __init__(self, agent_did: str):
+    def __init__(self, agent_did: str, out_dir: str = "proofs",
+                 stream: bool = False, durability: str = "batch",
+                 max_segment_bytes: int = 64 * 1024 * 1024,
+                 background: bool = False, max_pending: int = 10000,
+                 blobs=None, compress: bool = False, publisher=None,
+                 epoch_entries: int = 0, epoch_seconds: float = 0,
+                 on_epoch=None, index=None, session: str | None = None):
         self.agent_did = agent_did
-        self.entries = []
+        self.out_dir = Path(out_dir)
+        self.session = session or self.out_dir.name
+        # optional TraceIndex: one row per entry with its stored location
+        self.index = index
+        # columnar: raw digests, ns timestamps, canonical payload bytes
+        self.entries = EntryColumns()
+        # updated on every _record, so a root is available mid-session
+        self.tree = MerkleAccumulator()
+        self.tree_file = None
+        # stream=True appends every entry to JSONL segments as it is
+        # recorded and keeps only the hashes in memory
+        # (compress=True: zstd frames plus an offset index per segment)
+        self.writer = None
+        if stream:
+            writer_cls = ZstdTraceWriter if compress else JsonlTraceWriter
+            self.writer = writer_cls(
+                self.out_dir, durability=durability,
+                max_segment_bytes=max_segment_bytes)
+        # optional BlobStore: large payload strings are stored once by
+        # digest and entries reference them
+        self.blobs = blobs
+        self.blob_refs = set()
+        # CIDs are computed locally; an IpfsPublisher uploads the CAR later
+        self.publisher = publisher
+        self.lock = threading.Lock()
+        # optional checkpoints: epoch + cumulative root every N entries / T s
+        self.epochs = None
+        if epoch_entries or epoch_seconds:
+            self.epochs = EpochSealer(
+                self.lock, self.tree, self.out_dir, epoch_entries,
+                epoch_seconds, on_epoch,
+                flush=self.writer.sync_to if self.writer is not None else None)
+        # background=True moves canonicalization, hashing, storage and the
+        # Merkle update to a worker thread; log_* only enqueue a snapshot
+        self.queue = None
+        self.failed = []
+        if background:
+            self.queue = queue.Queue(maxsize=max_pending)
+            threading.Thread(target=self._drain, name="execution-logger",
+                             daemon=True).start()
 
     def _record(self, event_type: str, payload):
-        entry = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
-            "type":      event_type,
-            "payload":   payload
+        ts = datetime.utcnow()
+        if self.queue is not None:
+            self.queue.put((ts, event_type, _freeze(payload)))
+        else:
+            self._commit(ts, event_type, payload)
+
+    def _drain(self):
+        # the single consumer fixes the entry order: dequeue order is tree
+        # order, so concurrent producers cannot be seen "out of order"
+        for seq in itertools.count():
+            item = self.queue.get()
+            if item is None:     # finalize(): nothing more will be logged
+                self.queue.task_done()
+                return
+            try:
+                self._commit(*item)
+            except Exception as e:
+                self.failed.append((seq, e))
+            finally:
+                self.queue.task_done()
+
+    def _commit(self, ts: datetime, event_type: str, payload):
+        if self.blobs is not None:
+            payload = self.blobs.externalize(payload)
+            self._collect_refs(payload)
+        # digest of the RFC 8785 canonical JSON; each member (in particular
+        # the payload) is encoded once and reused for the stored line
+        members = {
+            "canon":     canonicalize(CANON_VERSION),
+            "timestamp": canonicalize(ts.isoformat() + "Z"),
+            "type":      canonicalize(event_type),
+            "payload":   canonicalize(payload),
         }
-        # digest of the canonical JSON
-        data = json.dumps(entry, sort_keys=True).encode()
-        entry["hash"] = hashlib.sha256(data).hexdigest()
-        self.entries.append(entry)
+        digest = hashlib.sha256(join_members(members)).digest()
+        if self.writer is not None:
+            members["hash"] = b'"%s"' % digest.hex().encode()
+            line = join_members(members)
+        checkpoint = None
+        location = (None, None, None)
+        with self.lock:
+            seq = self.tree.count
+            self.tree.append(digest)
+            if self.epochs is not None:
+                checkpoint = self.epochs.add(digest)
+            # stored in tree order; the writer reports where the line went
+            if self.writer is not None:
+                location = self.writer.append(line)
+            else:
+                self.entries.append(to_ns(ts), event_type, members["payload"],
+                                    digest)
+            if checkpoint is not None:
+                # still under the lock: epoch k is queued before epoch k+1
+                self.epochs.publish(checkpoint)
+        if self.index is not None:
+            label = payload.get("label") if isinstance(payload, dict) else None
+            self.index.add(self.session, seq, event_type, label, to_ns(ts),
+                           digest, *location)
+
+    def _collect_refs(self, obj):
+        if is_ref(obj):
+            self.blob_refs.add(ref_digest(obj))
+        elif isinstance(obj, dict):
+            for v in obj.values():
+                self._collect_refs(v)
+        elif isinstance(obj, list):
+            for v in obj:
+                self._collect_refs(v)
 
     # hook these into the response handler
     def log_text(self, label: str, text: str):
@@ -29,29 +150,96 @@ class ExecutionLogger:
     def log_error(self, label: str, err):
         self._record("ERROR", {"label": label, "error": err})
 
+    def flush(self):
+        """
+        Barrier: returns once every entry logged before the call has been
+        hashed, stored and added to the tree, in order.
+        """
+        if self.queue is not None:
+            self.queue.join()
+        if self.writer is not None:
+            self.writer.flush()
+        if self.index is not None:
+            self.index.flush()
+        if self.failed:
+            seq, err = self.failed[0]
+            raise RuntimeError(f"execution-log entry {seq} was not recorded") from err
+
+    def current_root(self) -> str | None:
+        """
+        Merkle root over the entries committed so far, O(log n). With
+        background=True call flush() first to include everything logged.
+        """
+        with self.lock:
+            return self.tree.root_hex()
+
+    def prove(self, index: int) -> list[dict]:
+        """
+        Inclusion proof for entry `index` (merkletools format), checkable
+        with verify(entry, proof, root). After finalize() it is read from
+        the memory-mapped execution_tree.bin.
+        """
+        if self.tree_file is not None:
+            return self.tree_file.proof(index)
+        with self.lock:
+            return self.tree.proof(index)
+
     def finalize(self):
-        # Build a Merkle tree over the entry hashes
-        mt = MerkleTools(hash_type="sha256")
-        for e in self.entries:
-            mt.add_leaf(e["hash"], do_hash=False)
-        mt.make_tree()
-        root = mt.get_merkle_root()
+        try:
+            self.flush()
+        finally:
+            if self.queue is not None:
+                # stop the worker, also when flush() reports a lost entry;
+                # anything logged later is committed inline
+                self.queue.put(None)
+                self.queue.join()
+                self.queue = None
+        # Same root and layers merkletools would build over the entry hashes
+        root = self.tree.root_hex()
+        # the last checkpoint syncs the writer, so seal before closing it
+        checkpoints = self.epochs.close() if self.epochs is not None else []
 
         # write out full trace + tree
-        with open("proofs/execution_trace.json", "w") as f:
-            json.dump(self.entries, f, indent=2)
-        with open("proofs/execution_tree.json", "w") as f:
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        tree_path = self.out_dir / "execution_tree.json"
+        bin_path  = self.out_dir / "execution_tree.bin"
+        if self.writer is not None:
+            # already on disk, nothing to re-serialize
+            self.writer.close()
+            trace_paths = list(self.writer.segments)
+            trace_paths += getattr(self.writer, "indexes", [])
+        else:
+            trace_paths = [self.out_dir / "execution_trace.json"]
+            rows = [] if self.index is not None else None
+            with open(trace_paths[0], "wb") as f:
+                self.entries.write_json(f, rows)
+            if rows is not None:
+                name = trace_paths[0].name
+                self.index.locate(self.session, ((i, name, offset, n)
+                                                 for i, offset, n in rows))
+        # layers go to the binary file; the JSON keeps the root for the
+        # credential scripts (merkle_store.to_json gives the full hex form)
+        write_tree(bin_path, self.tree)
+        self.tree_file = MerkleTreeFile(bin_path)
+        with open(tree_path, "w") as f:
             json.dump({
                 "root": root,
-                "layers": mt.get_layers()
+                "leaf_count": self.tree.count,
+                "tree": bin_path.name
             }, f, indent=2)
 
-        # publish to IPFS
-        client = ipfshttpclient.connect()  
-        res = client.add(["proofs/execution_trace.json", "proofs/execution_tree.json"])
-        # res is a list of dicts with 'Hash' fields
-        cids = { Path(x["Name"]).name: x["Hash"] for x in res }
-        with open("proofs/execution_cids.json", "w") as f:
+        # same CIDs `ipfs add --cid-version=1 -w` gives, computed offline;
+        # all blocks go into one CAR rooted at the wrapping directory
+        blob_paths = [self.blobs.path(d) for d in sorted(self.blob_refs)]
+        trace_paths += checkpoints
+        car_path = self.out_dir / "execution.car"
+        cids = export_car(trace_paths + blob_paths + [tree_path, bin_path],
+                          car_path)
+        cids_path = self.out_dir / "execution_cids.json"
+        with open(cids_path, "w") as f:
             json.dump(cids, f, indent=2)
+        if self.publisher is not None:
+            # durable, retried in the background; adds "pinned" when done
+            self.publisher.submit([car_path], kind="car", record=cids_path)
 
-        return root, cids
\ No newline at end of file
+        return root, cids
@@ -0,0 +1,245 @@
+# github_agent/utils/instrument.py
+import math, logging, functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from langchain.callbacks.base import BaseCallbackHandler
+from langchain.embeddings.base import Embeddings
+
+from github_agent.utils.canonical import MAX_SAFE_INT
+
+logger = logging.getLogger(__name__)
+
+# Records what a session does into its ExecutionLogger without touching
+# the code that does it. The logger of the running assist() call lives in
+# a ContextVar, so tools, actions and LangChain callbacks deep inside the
+# call find it (asyncio tasks and to_thread copy the context). With no
+# logger set every wrapper is a single ContextVar lookup.
+#
+# Tool inputs and outputs are converted to JSON values recursively: what
+# the canonical form rejects (ints beyond 2^53, NaN/Infinity) becomes a
+# string and anything else its repr. Strings are passed on as they are and
+# large ones become BlobStore references keyed by identity. A failure to
+# log is reported and swallowed, never raised into the instrumented call.
+
+CURRENT_LOG: ContextVar = ContextVar("execution_logger", default=None)
+
+
+@contextmanager
+def use_logger(log):
+    """Makes `log` the session logger for the enclosed block."""
+    token = CURRENT_LOG.set(log)
+    try:
+        yield log
+    finally:
+        CURRENT_LOG.reset(token)
+
+
+@contextmanager
+def _quiet(label: str):
+    """Logs and swallows errors of the instrumentation in the block."""
+    try:
+        yield
+    except Exception:
+        logger.exception(f"could not record {label!r} in the execution log")
+
+
+def _jsonable(obj):
+    if obj is None or isinstance(obj, (str, bool)):
+        return obj
+    if isinstance(obj, int):
+        return obj if abs(obj) <= MAX_SAFE_INT else str(obj)
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else repr(obj)
+    if isinstance(obj, dict):
+        return {k if isinstance(k, (str, int, bool)) or k is None else repr(k):
+                _jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_jsonable(v) for v in obj]
+    # ToolIO-like objects: keep the fields, not a repr
+    if hasattr(obj, "text") or hasattr(obj, "payload"):
+        return {"text": _jsonable(getattr(obj, "text", None)),
+                "payload": _jsonable(getattr(obj, "payload", None))}
+    if hasattr(obj, "model_dump"):
+        try:
+            return obj.model_dump(mode="json")
+        except Exception:
+            pass
+    return repr(obj)
+
+
+def _is_handler(obj) -> bool:
+    return (hasattr(obj, "emit_text_block")
+            and not isinstance(obj, InstrumentedResponseHandler))
+
+
+class InstrumentedResponseHandler:
+    """
+    ResponseHandler proxy: every emitted event is also logged (TEXT for text
+    blocks and finished streams, JSON for json events, ERROR for errors).
+    Anything not wrapped here is forwarded unchanged.
+    """
+
+    def __init__(self, rh, log):
+        self._rh = rh
+        self._log = log
+
+    def __getattr__(self, name):
+        return getattr(self._rh, name)
+
+    async def emit_text_block(self, event_name, content, *args, **kwargs):
+        with _quiet(event_name):
+            self._log.log_text(event_name, content)
+        return await self._rh.emit_text_block(event_name, content, *args, **kwargs)
+
+    async def emit_json(self, event_name, data, *args, **kwargs):
+        with _quiet(event_name):
+            self._log.log_json(event_name, _jsonable(data))
+        return await self._rh.emit_json(event_name, data, *args, **kwargs)
+
+    async def respond(self, event_name, response, *args, **kwargs):
+        with _quiet(event_name):
+            if isinstance(response, str):
+                self._log.log_text(event_name, response)
+            else:
+                self._log.log_json(event_name, _jsonable(response))
+        return await self._rh.respond(event_name, response, *args, **kwargs)
+
+    async def emit_error(self, error_message, error_code=500, details=None,
+                         *args, **kwargs):
+        with _quiet("error"):
+            self._log.log_error("error", _jsonable({
+                "message": error_message, "code": error_code,
+                "details": details}))
+        return await self._rh.emit_error(error_message, error_code, details,
+                                         *args, **kwargs)
+
+    def create_text_stream(self, event_name, *args, **kwargs):
+        return _InstrumentedStream(
+            self._rh.create_text_stream(event_name, *args, **kwargs),
+            event_name, self._log)
+
+    async def complete(self, *args, **kwargs):
+        with _quiet("complete"):
+            self._log.log_json("complete", None)
+        return await self._rh.complete(*args, **kwargs)
+
+
+class _InstrumentedStream:
+    """Collects chunk references and logs the whole text once, on complete()."""
+
+    def __init__(self, stream, event_name, log):
+        self._stream = stream
+        self._event_name = event_name
+        self._log = log
+        self._chunks = []
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+    async def emit_chunk(self, chunk, *args, **kwargs):
+        self._chunks.append(chunk)
+        return await self._stream.emit_chunk(chunk, *args, **kwargs)
+
+    async def complete(self, *args, **kwargs):
+        with _quiet(self._event_name):
+            self._log.log_text(self._event_name,
+                               "".join(map(str, self._chunks)))
+        return await self._stream.complete(*args, **kwargs)
+
+
+def traced(label: str | None = None):
+    """
+    Decorator for async Tool._run / Action._run methods: logs the input,
+    the output (or the exception) into the current session logger. A
+    ResponseHandler argument (Action._run(inputs, rh)) is proxied too.
+    """
+    def wrap(fn):
+        name = label or fn.__qualname__
+
+        @functools.wraps(fn)
+        async def run(self, inp, *args, **kwargs):
+            log = CURRENT_LOG.get()
+            if log is None:
+                return await fn(self, inp, *args, **kwargs)
+            with _quiet(name):
+                log.log_json(name, {"call": "input", "value": _jsonable(inp)})
+            args = [InstrumentedResponseHandler(a, log) if _is_handler(a) else a
+                    for a in args]
+            try:
+                out = await fn(self, inp, *args, **kwargs)
+            except Exception as e:
+                with _quiet(name):
+                    log.log_error(name, {"type": type(e).__name__,
+                                         "message": str(e)})
+                raise
+            with _quiet(name):
+                log.log_json(name, {"call": "output", "value": _jsonable(out)})
+            return out
+        return run
+    return wrap
+
+
+class ExecutionCallbackHandler(BaseCallbackHandler):
+    """LangChain callbacks -> current session logger (prompts, outputs, usage)."""
+
+    def on_llm_start(self, serialized, prompts, **kwargs):
+        if (log := CURRENT_LOG.get()) is None:
+            return
+        with _quiet("llm"):
+            log.log_json("llm", {"call": "input", "prompts": prompts,
+                                 "model": (serialized or {}).get("kwargs", {}).get("model_name")})
+
+    def on_chat_model_start(self, serialized, messages, **kwargs):
+        if (log := CURRENT_LOG.get()) is None:
+            return
+        with _quiet("llm"):
+            log.log_json("llm", {
+                "call": "input",
+                "messages": [[{"role": m.type, "content": _jsonable(m.content)}
+                              for m in batch] for batch in messages],
+                "model": (serialized or {}).get("kwargs", {}).get("model_name")})
+
+    def on_llm_end(self, response, **kwargs):
+        if (log := CURRENT_LOG.get()) is None:
+            return
+        with _quiet("llm"):
+            log.log_json("llm", {
+                "call": "output",
+                "generations": [[g.text for g in gens] for gens in response.generations],
+                "usage": _jsonable((response.llm_output or {}).get("token_usage"))})
+
+    def on_llm_error(self, error, **kwargs):
+        if (log := CURRENT_LOG.get()) is None:
+            return
+        with _quiet("llm"):
+            log.log_error("llm", {"type": type(error).__name__, "message": str(error)})
+
+
+class TracedEmbeddings(Embeddings):
+    """Embeddings wrapper that logs each call's size (not the vectors)."""
+
+    def __init__(self, inner: Embeddings):
+        self.inner = inner
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    def _log(self, texts: list[str], vectors):
+        if (log := CURRENT_LOG.get()) is None:
+            return
+        with _quiet("embedding"):
+            log.log_json("embedding", {
+                "texts": len(texts), "chars": sum(map(len, texts)),
+                "dims": len(vectors[0]) if vectors else 0,
+                "model": getattr(self.inner, "model", None)})
+
+    def embed_documents(self, texts):
+        vectors = self.inner.embed_documents(texts)
+        self._log(texts, vectors)
+        return vectors
+
+    def embed_query(self, text):
+        vector = self.inner.embed_query(text)
+        self._log([text], [vector])
+        return vector
@@ -0,0 +1,230 @@
+# github_agent/utils/ipfs_publisher.py
+import os, json, time, uuid, heapq, random, logging, threading
+from pathlib import Path
+
+from github_agent.utils.metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+IPFS_API = os.getenv("IPFS_API", "http://127.0.0.1:5001")
+
+PUBLISHED = Counter("ipfs_publish_total", "IPFS upload attempts by result",
+                    labels=("result",))
+PENDING = Gauge("ipfs_publish_pending", "Uploads waiting in the publish queue")
+
+# Jobs are JSON files in `queue_dir`, written before submit() returns and
+# removed only once the daemon has answered, so a restart picks up where
+# the last process stopped. Jobs that run out of attempts move to
+# `queue_dir/failed/`.
+#
+#   kind "car"   POST /api/v0/dag/import   (one CAR, roots are pinned)
+#   kind "add"   POST /api/v0/add          (files, wrapped in a directory)
+
+
+class PermanentError(Exception):
+    """The daemon rejected the upload; retrying will not help."""
+
+
+def _multipart(paths, boundary: str, chunk_size: int = 1 << 20):
+    """Streams a multipart/form-data body without loading whole files."""
+    for p in paths:
+        p = Path(p)
+        yield (f"--{boundary}\r\n"
+               f'Content-Disposition: form-data; name="file"; '
+               f'filename="{p.name}"\r\n'
+               "Content-Type: application/octet-stream\r\n\r\n").encode()
+        with open(p, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                yield chunk
+        yield b"\r\n"
+    yield f"--{boundary}--\r\n".encode()
+
+
+def _ndjson(text: str) -> list[dict]:
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+_RECORD_LOCK = threading.Lock()
+
+
+def _update_record(path: Path, update: dict):
+    with _RECORD_LOCK:
+        data = json.loads(path.read_text()) if path.exists() else {}
+        for name, cid in update.items():
+            if isinstance(cid, str) and data.get(name, cid) != cid:
+                logger.warning(f"{path}: daemon CID for {name} is {cid}, "
+                               f"computed {data[name]}")
+        data.update(update)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(data, indent=2))
+        os.replace(tmp, path)
+
+
+class IpfsPublisher:
+    """
+    Background, retrying uploader to a kubo HTTP API. submit() persists a
+    job and returns at once; `workers` threads share one pooled
+    requests.Session and retry failures with jittered exponential backoff.
+    On success the CIDs reported by the daemon are merged into the job's
+    `record` file (execution_cids.json).
+    """
+
+    def __init__(self, api: str = IPFS_API, queue_dir="proofs/.publish",
+                 workers: int = 2, max_attempts: int = 10,
+                 backoff: float = 1.0, max_backoff: float = 300,
+                 timeout: float = 300):
+        import requests
+        from requests.adapters import HTTPAdapter
+        self.api = api.rstrip("/")
+        self.queue_dir = Path(queue_dir)
+        self.failed_dir = self.queue_dir / "failed"
+        self.failed_dir.mkdir(parents=True, exist_ok=True)
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.http = requests.Session()
+        self.http.mount(self.api, HTTPAdapter(pool_connections=1,
+                                              pool_maxsize=workers))
+        self.heap: list[tuple[float, str]] = []
+        self.running = 0
+        self.cond = threading.Condition()
+        self.stopped = False
+        # recover jobs left by a previous process
+        for path in sorted(self.queue_dir.glob("*.json")):
+            job = json.loads(path.read_text())
+            heapq.heappush(self.heap, (job.get("next_at", 0), job["id"]))
+        PENDING.set(len(self.heap))
+        self.threads = [threading.Thread(target=self._work, daemon=True,
+                                         name=f"ipfs-publish-{i}")
+                        for i in range(workers)]
+        for t in self.threads:
+            t.start()
+
+    def _job_path(self, job_id: str) -> Path:
+        return self.queue_dir / f"{job_id}.json"
+
+    def _save(self, job: dict):
+        path = self._job_path(job["id"])
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(job))
+        os.replace(tmp, path)
+
+    def submit(self, paths, kind: str = "add", record=None) -> str:
+        if kind not in ("add", "car"):
+            raise ValueError(f"unknown job kind {kind!r}")
+        job = {"id": f"{time.time_ns()}-{uuid.uuid4().hex[:8]}", "kind": kind,
+               "paths": [str(Path(p).resolve()) for p in paths],
+               "record": str(Path(record).resolve()) if record else None,
+               "attempts": 0, "next_at": 0}
+        self._save(job)
+        with self.cond:
+            heapq.heappush(self.heap, (0, job["id"]))
+            PENDING.set(len(self.heap))
+            self.cond.notify()
+        return job["id"]
+
+    def _next(self) -> str | None:
+        with self.cond:
+            while not self.stopped:
+                now = time.time()
+                if self.heap and self.heap[0][0] <= now:
+                    _, job_id = heapq.heappop(self.heap)
+                    self.running += 1
+                    PENDING.set(len(self.heap))
+                    return job_id
+                self.cond.wait(self.heap[0][0] - now if self.heap else None)
+            return None
+
+    def _work(self):
+        while (job_id := self._next()) is not None:
+            try:
+                self._attempt(json.loads(self._job_path(job_id).read_text()))
+            except Exception:
+                logger.exception(f"publish job {job_id} crashed")
+            finally:
+                with self.cond:
+                    self.running -= 1
+                    self.cond.notify_all()
+
+    def _attempt(self, job: dict):
+        try:
+            cids = self._upload(job)
+        except PermanentError as e:
+            self._give_up(job, str(e))
+            return
+        except Exception as e:
+            job["attempts"] += 1
+            if job["attempts"] >= self.max_attempts:
+                self._give_up(job, str(e))
+                return
+            delay = min(self.max_backoff, self.backoff * 2 ** (job["attempts"] - 1))
+            job["next_at"] = time.time() + delay * random.uniform(0.5, 1.0)
+            job["error"] = str(e)
+            self._save(job)
+            PUBLISHED.inc(result="retry")
+            logger.warning(f"publish {job['id']} failed (attempt "
+                           f"{job['attempts']}), retrying in {delay:.0f}s: {e}")
+            with self.cond:
+                heapq.heappush(self.heap, (job["next_at"], job["id"]))
+                PENDING.set(len(self.heap))
+                self.cond.notify()
+            return
+        if job["record"]:
+            _update_record(Path(job["record"]), cids)
+        self._job_path(job["id"]).unlink()
+        PUBLISHED.inc(result="ok")
+
+    def _give_up(self, job: dict, error: str):
+        job["error"] = error
+        (self.failed_dir / f"{job['id']}.json").write_text(json.dumps(job))
+        self._job_path(job["id"]).unlink()
+        PUBLISHED.inc(result="failed")
+        logger.error(f"publish {job['id']} abandoned: {error}")
+
+    def _post(self, endpoint: str, paths, params: dict) -> list[dict]:
+        for p in paths:
+            if not Path(p).exists():
+                raise PermanentError(f"{p} no longer exists")
+        boundary = uuid.uuid4().hex
+        res = self.http.post(
+            f"{self.api}/api/v0/{endpoint}", params=params,
+            data=_multipart(paths, boundary), timeout=self.timeout,
+            headers={"Content-Type": f"multipart/form-data; boundary={boundary}"})
+        if 400 <= res.status_code < 500 and res.status_code != 429:
+            raise PermanentError(f"{res.status_code}: {res.text[:200]}")
+        res.raise_for_status()
+        return _ndjson(res.text)
+
+    def _upload(self, job: dict) -> dict:
+        if job["kind"] == "car":
+            lines = self._post("dag/import", job["paths"], {"pin-roots": "true"})
+            roots = [x["Root"] for x in lines if "Root" in x]
+            errors = [r["PinErrorMsg"] for r in roots if r.get("PinErrorMsg")]
+            if errors:
+                raise RuntimeError(f"pinning failed: {errors[0]}")
+            return {"pinned": [r["Cid"]["/"] for r in roots]}
+        lines = self._post("add", job["paths"], {
+            "cid-version": 1, "wrap-with-directory": "true", "pin": "true"})
+        # the wrapping directory is reported with an empty name
+        return {(x["Name"] or "directory"): x["Hash"] for x in lines
+                if "Hash" in x}
+
+    def join(self, timeout: float | None = None) -> bool:
+        """Waits until every due job has been attempted (for tests/shutdown)."""
+        deadline = None if timeout is None else time.time() + timeout
+        with self.cond:
+            while self.running or (self.heap and self.heap[0][0] <= time.time()):
+                left = None if deadline is None else deadline - time.time()
+                if left is not None and left <= 0:
+                    return False
+                self.cond.wait(left)
+            return True
+
+    def close(self):
+        with self.cond:
+            self.stopped = True
+            self.cond.notify_all()
+        for t in self.threads:
+            t.join()
+        self.http.close()
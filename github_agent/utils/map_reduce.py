@@ -0,0 +1,111 @@
+# github_agent/utils/map_reduce.py
+import os, json, asyncio, hashlib
+from pathlib import Path
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from github_agent.utils.metrics import CACHE, IN_PROGRESS
+
+# READMEs above this size are summarised section by section instead of
+# going through RetrievalQA, which only ever sees the top few chunks.
+MAP_REDUCE_CHARS = int(os.getenv("MAP_REDUCE_CHARS", 24000))
+CACHE_DIR = Path(os.getenv("AGENT_CACHE_DIR", ".cache")) / "summaries"
+
+MAP_PROMPT = (
+    "Summarise this section of a GitHub repository README in at most "
+    "4 sentences. Keep names of features, APIs and commands.\n\n{text}"
+)
+REDUCE_PROMPT = (
+    "These are summaries of consecutive sections of one repository README. "
+    "Merge them into a single summary of at most 6 sentences.\n\n{text}"
+)
+FINAL_PROMPT = (
+    "Using these notes on a repository README, provide a concise "
+    "5‑sentence overview of this repository.\n\n{text}"
+)
+
+
+class MapReduceSummarizer:
+    """
+    Summarises oversized documents without overflowing the context window:
+    sections are summarised concurrently (map), then the partial summaries
+    are merged in groups of `fan_in` until one is left (reduce).
+    Every LLM result is cached on disk under sha256(model, prompt, text).
+    """
+
+    def __init__(self, llm, max_concurrency: int = 8, fan_in: int = 6,
+                 chunk_size: int = 8000, cache_dir: Path = CACHE_DIR):
+        self.llm = llm
+        self.fan_in = fan_in
+        self.splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size, chunk_overlap=200,
+            separators=["\n# ", "\n## ", "\n### ", "\n\n", "\n", " ", ""])
+        self.limit = asyncio.Semaphore(max_concurrency)
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.memo: dict[str, str] = {}
+
+    def _key(self, prompt: str, text: str) -> str:
+        model = getattr(self.llm, "model_name", "")
+        h = hashlib.sha256()
+        for part in (model, prompt, text):
+            h.update(part.encode())
+            h.update(b"\0")
+        return h.hexdigest()
+
+    def _lookup(self, key: str) -> str | None:
+        if key in self.memo:
+            return self.memo[key]
+        path = self.cache_dir / f"{key}.json"
+        if path.exists():
+            self.memo[key] = json.loads(path.read_text())["text"]
+            return self.memo[key]
+        return None
+
+    def _store(self, key: str, out: str):
+        path = self.cache_dir / f"{key}.json"
+        # write-then-rename so concurrent readers never see half a file
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"text": out}))
+        os.replace(tmp, path)
+        self.memo[key] = out
+
+    async def _complete(self, prompt: str, text: str) -> str:
+        key = self._key(prompt, text)
+        out = self._lookup(key)
+        if out is not None:
+            CACHE.hit("summary")
+            return out
+        CACHE.miss("summary")
+        async with self.limit:
+            with IN_PROGRESS.track(what="llm_call"):
+                msg = await self.llm.ainvoke(prompt.format(text=text))
+        self._store(key, msg.content)
+        return msg.content
+
+    def remember(self, text: str, summary: str):
+        """Caches a summary of `text` produced outside this class."""
+        self._store(self._key("document", text), summary)
+
+    def cached(self, text: str) -> str | None:
+        """Final summary of `text` from an earlier run, without any LLM call."""
+        return self._lookup(self._key("document", text))
+
+    async def summarize(self, text: str) -> str:
+        sections = self.splitter.split_text(text)
+        parts = await asyncio.gather(
+            *(self._complete(MAP_PROMPT, s) for s in sections))
+        while len(parts) > self.fan_in:
+            groups = [parts[i:i + self.fan_in]
+                      for i in range(0, len(parts), self.fan_in)]
+            parts = await asyncio.gather(
+                *(self._complete(REDUCE_PROMPT, "\n\n".join(g)) for g in groups))
+        summary = await self._complete(FINAL_PROMPT, "\n\n".join(parts))
+        self.remember(text, summary)
+        return summary
+
+    async def summarize_head(self, text: str, max_chars: int) -> str:
+        """Cheap mode: one call over the first `max_chars` of the document."""
+        summary = await self._complete(FINAL_PROMPT, text[:max_chars])
+        if len(text) <= max_chars:
+            self.remember(text, summary)
+        return summary
@@ -0,0 +1,151 @@
+# github_agent/utils/merkle.py
+import hashlib
+
+# SHA-256 Merkle tree with the same shape as merkletools' make_tree():
+# leaves are paired left to right and an odd node at the end of a level is
+# carried up unchanged. That tree's root equals the "mountain range" peaks
+# of the complete 2^k subtrees folded from the right, which is what lets
+# the accumulator below append in O(log n) and produce a root at any time.
+
+
+def _h(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(left + right).digest()
+
+
+def proof_path(node, counts: list[int], index: int) -> list[dict]:
+    """
+    Audit path for leaf `index` in merkletools' proof format, a list of
+    {"left": hex} / {"right": hex} siblings from the leaf upwards.
+    `node(layer, i)` returns a digest and `counts` the nodes per layer,
+    leaves first.
+    """
+    if not 0 <= index < (counts[0] if counts else 0):
+        raise IndexError(f"leaf {index} out of range")
+    proof = []
+    for layer, count in enumerate(counts[:-1]):
+        # a carried odd end node has no sibling on this layer
+        if not (index == count - 1 and count % 2):
+            if index % 2:
+                proof.append({"left": node(layer, index - 1).hex()})
+            else:
+                proof.append({"right": node(layer, index + 1).hex()})
+        index //= 2
+    return proof
+
+
+def verify_proof(leaf, proof: list[dict], root) -> bool:
+    """Checks an audit path; `leaf` and `root` are raw or hex digests."""
+    h = bytes.fromhex(leaf) if isinstance(leaf, str) else bytes(leaf)
+    for step in proof:
+        if "left" in step:
+            h = _h(bytes.fromhex(step["left"]), h)
+        else:
+            h = _h(h, bytes.fromhex(step["right"]))
+    return h.hex() == (root if isinstance(root, str) else bytes(root).hex())
+
+
+class MerkleAccumulator:
+    """
+    Append-only Merkle accumulator.
+
+    levels[k] holds, as concatenated 32-byte digests, the roots of every
+    complete subtree of 2^k leaves. Appending a leaf adds one digest to
+    levels[0] and carries pairs upwards (amortised O(1), worst case
+    O(log n)); root() folds the odd trailing node of each level, O(log n).
+    With keep_levels=False only the frontier (one pending node per level)
+    is kept, which is all an incremental verifier needs.
+    """
+
+    def __init__(self, keep_levels: bool = True):
+        self.keep_levels = keep_levels
+        self.count = 0
+        self.levels: list[bytearray] = []   # keep_levels=True
+        self.frontier: list[bytes | None] = []   # keep_levels=False
+
+    def append(self, digest: bytes):
+        self.count += 1
+        node, k = digest, 0
+        if self.keep_levels:
+            while True:
+                if k == len(self.levels):
+                    self.levels.append(bytearray())
+                level = self.levels[k]
+                level += node
+                if len(level) % 64:
+                    break
+                node = _h(bytes(level[-64:-32]), bytes(level[-32:]))
+                k += 1
+        else:
+            while True:
+                if k == len(self.frontier):
+                    self.frontier.append(None)
+                left = self.frontier[k]
+                if left is None:
+                    self.frontier[k] = node
+                    break
+                self.frontier[k] = None
+                node = _h(left, node)
+                k += 1
+
+    def append_hex(self, digest_hex: str):
+        self.append(bytes.fromhex(digest_hex))
+
+    def _peaks(self) -> list[bytes]:
+        """Pending node per level, lowest level first."""
+        if not self.keep_levels:
+            return [p for p in self.frontier if p is not None]
+        return [bytes(level[-32:]) for level in self.levels
+                if len(level) % 64]
+
+    def root(self) -> bytes | None:
+        acc = None
+        for peak in self._peaks():
+            acc = peak if acc is None else _h(peak, acc)
+        return acc
+
+    def root_hex(self) -> str | None:
+        r = self.root()
+        return r.hex() if r is not None else None
+
+    def layer_parts(self):
+        """
+        Yields each layer of the full tree, leaves first and root last, as
+        (stored digests, carried node or None). Only the carried trailing
+        nodes are hashed here; everything else is already stored.
+        """
+        if not self.keep_levels:
+            raise ValueError("layer_parts() needs keep_levels=True")
+        if not self.count:
+            return
+        acc = None
+        for level in self.levels:
+            # acc is the carried node folded from the levels below
+            yield level, acc
+            if len(level) // 32 + (acc is not None) == 1:
+                return
+            if len(level) % 64:
+                tail = bytes(level[-32:])
+                acc = tail if acc is None else _h(tail, acc)
+        yield bytearray(), acc
+
+    def layers(self) -> list[list[bytes]]:
+        """Full tree, identical to merkletools' levels in reverse."""
+        out = []
+        for stored, carried in self.layer_parts():
+            nodes = [bytes(stored[i:i + 32]) for i in range(0, len(stored), 32)]
+            out.append(nodes + [carried] if carried is not None else nodes)
+        return out
+
+    def proof(self, index: int) -> list[dict]:
+        """Audit path for leaf `index` against the current root."""
+        parts = list(self.layer_parts())
+        counts = [len(stored) // 32 + (carried is not None)
+                  for stored, carried in parts]
+
+        def node(layer, i):
+            stored, carried = parts[layer]
+            if i * 32 < len(stored):
+                return bytes(stored[i * 32:(i + 1) * 32])
+            return carried
+
+        return proof_path(node, counts, index)
@@ -0,0 +1,133 @@
+# github_agent/utils/merkle_store.py
+import os, json, mmap, struct
+from pathlib import Path
+
+from github_agent.utils.merkle import MerkleAccumulator, proof_path
+
+# Binary Merkle tree file (little-endian):
+#
+#   header   magic "VAMTREE\0" | version u16 | hash id u16 (1 = sha256)
+#            | digest size u16 | reserved u16 | leaf count u64
+#            | layer count u32 | reserved u32                  (32 bytes)
+#   table    layer count x (byte offset u64, node count u64)
+#   layers   leaves first, root last; each layer is one contiguous
+#            array of raw 32-byte digests
+#
+# Every node sits at a computable offset, so a mapped file answers node and
+# proof lookups without parsing anything else.
+
+MAGIC = b"VAMTREE\0"
+VERSION = 1
+SHA256 = 1
+DIGEST = 32
+HEADER = struct.Struct("<8sHHHHQII")
+ENTRY = struct.Struct("<QQ")
+
+
+def write_tree(path, layers) -> Path:
+    """
+    Writes `layers` to `path`. `layers` is either a MerkleAccumulator or a
+    list of layers (leaves first) of raw digests.
+    """
+    if isinstance(layers, MerkleAccumulator):
+        parts = list(layers.layer_parts())
+    else:
+        parts = [(b"".join(layer), None) for layer in layers]
+    counts = [len(stored) // DIGEST + (carried is not None)
+              for stored, carried in parts]
+    leaf_count = counts[0] if counts else 0
+
+    path = Path(path)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    offset = HEADER.size + ENTRY.size * len(parts)
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, SHA256, DIGEST, 0,
+                            leaf_count, len(parts), 0))
+        for n in counts:
+            f.write(ENTRY.pack(offset, n))
+            offset += n * DIGEST
+        for stored, carried in parts:
+            f.write(stored)
+            if carried is not None:
+                f.write(carried)
+    os.replace(tmp, path)
+    return path
+
+
+class MerkleTreeFile:
+    """Read-only, memory-mapped view of a binary tree file."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self.buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, hash_id, size, _, leaves, n_layers, _ = \
+            HEADER.unpack_from(self.buf, 0)
+        if magic != MAGIC or hash_id != SHA256 or size != DIGEST:
+            raise ValueError(f"{self.path} is not a SHA-256 Merkle tree file")
+        if version != VERSION:
+            raise ValueError(f"unsupported tree file version {version}")
+        self.leaf_count = leaves
+        self.table = [ENTRY.unpack_from(self.buf, HEADER.size + i * ENTRY.size)
+                      for i in range(n_layers)]
+
+    def __len__(self):
+        return self.leaf_count
+
+    @property
+    def depth(self) -> int:
+        return len(self.table)
+
+    def node(self, layer: int, index: int) -> bytes:
+        offset, count = self.table[layer]
+        if not 0 <= index < count:
+            raise IndexError(f"node {index} out of range for layer {layer}")
+        start = offset + index * DIGEST
+        return self.buf[start:start + DIGEST]
+
+    def layer(self, layer: int) -> list[bytes]:
+        offset, count = self.table[layer]
+        return [self.buf[offset + i * DIGEST: offset + (i + 1) * DIGEST]
+                for i in range(count)]
+
+    @property
+    def root(self) -> bytes | None:
+        return self.node(self.depth - 1, 0) if self.table else None
+
+    def proof(self, index: int) -> list[dict]:
+        """Audit path for leaf `index`; reads O(log n) nodes from the map."""
+        return proof_path(self.node, [count for _, count in self.table], index)
+
+    def close(self):
+        self.buf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def to_json(bin_path, json_path=None) -> dict:
+    """Converts a binary tree file to the {"root", "layers"} hex JSON form."""
+    with MerkleTreeFile(bin_path) as tree:
+        data = {
+            "root": tree.root.hex() if tree.root else None,
+            "layers": [[n.hex() for n in tree.layer(i)]
+                       for i in range(tree.depth)],
+        }
+    if json_path:
+        Path(json_path).write_text(json.dumps(data, indent=2))
+    return data
+
+
+def from_json(json_path, bin_path) -> Path:
+    """Converts the hex JSON form (leaves-first layers) to a binary file."""
+    data = json.loads(Path(json_path).read_text())
+    layers = [[bytes.fromhex(n) for n in layer] for layer in data["layers"]]
+    if len(layers) > 1 and len(layers[0]) == 1 and len(layers[-1]) > 1:
+        # root-first layer order (merkletools' own `levels`)
+        layers.reverse()
+    if layers and layers[-1][0].hex() != data.get("root", layers[-1][0].hex()):
+        raise ValueError("root does not match the last layer")
+    return write_tree(bin_path, layers)
@@ -0,0 +1,229 @@
+# github_agent/utils/metrics.py
+import time, threading
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+
+# Minimal in-process metrics rendered in the Prometheus text format.
+# Values are per process; labels are passed as keyword arguments.
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+REGISTRY = []
+
+
+def _escape(value) -> str:
+    # label values escape backslash, double quote and newline
+    return (str(value).replace("\\", "\\\\").replace('"', '\\"')
+            .replace("\n", "\\n"))
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labels)
+        self.values = {}
+        self.lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict):
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}",
+                 f"# TYPE {self.name} {self.kind}"]
+        with self.lock:
+            items = list(self.values.items())
+        for key, value in items:
+            lines.append(f"{self.name}{_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track(self, **labels):
+        """Counts the enclosed block as in flight."""
+        self.inc(1, **labels)
+        try:
+            yield
+        finally:
+            self.inc(-1, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple = (),
+                 buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        i = bisect_left(self.buckets, value)
+        with self.lock:
+            counts, total = self.values.get(key, (None, 0.0))
+            if counts is None:
+                counts = [0] * (len(self.buckets) + 1)
+            counts[i] += 1
+            self.values[key] = (counts, total + value)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}",
+                 f"# TYPE {self.name} {self.kind}"]
+        with self.lock:
+            items = [(k, (list(c), s)) for k, (c, s) in self.values.items()]
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets + ("+Inf",), counts):
+                cumulative += n
+                le = _labels(self.labelnames, key, [("le", bound)])
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lbl = _labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{lbl} {total}")
+            lines.append(f"{self.name}_count{lbl} {cumulative}")
+        return lines
+
+
+class Summary(_Metric):
+    """
+    Latency quantiles over the last `window` observations per label set.
+    Recording is a deque append; sorting happens only when scraped.
+    """
+    kind = "summary"
+
+    def __init__(self, name: str, help: str, labels: tuple = (),
+                 quantiles: tuple = (0.5, 0.95, 0.99), window: int = 2048):
+        super().__init__(name, help, labels)
+        self.quantiles = quantiles
+        self.window = window
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self.lock:
+            entry = self.values.get(key)
+            if entry is None:
+                entry = self.values[key] = [deque(maxlen=self.window), 0, 0.0]
+            entry[0].append(value)
+            entry[1] += 1
+            entry[2] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}",
+                 f"# TYPE {self.name} {self.kind}"]
+        with self.lock:
+            items = [(k, sorted(w), n, s) for k, (w, n, s) in self.values.items()]
+        for key, window, count, total in items:
+            for q in self.quantiles:
+                value = window[min(len(window) - 1, int(q * len(window)))]
+                lbl = _labels(self.labelnames, key, [("quantile", q)])
+                lines.append(f"{self.name}{lbl} {value}")
+            lbl = _labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{lbl} {total}")
+            lines.append(f"{self.name}_count{lbl} {count}")
+        return lines
+
+
+class CacheStats(_Metric):
+    """Hit/miss counters per cache, rendered with the derived hit ratio."""
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, ratio_name: str):
+        super().__init__(name, help, ("cache", "result"))
+        self.ratio_name = ratio_name
+
+    def hit(self, cache: str):
+        self._bump((cache, "hit"))
+
+    def miss(self, cache: str):
+        self._bump((cache, "miss"))
+
+    def _bump(self, key):
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + 1
+
+    def render(self) -> list[str]:
+        lines = super().render()
+        with self.lock:
+            values = dict(self.values)
+        caches = sorted({c for c, _ in values})
+        lines += [f"# HELP {self.ratio_name} Share of lookups served from cache",
+                  f"# TYPE {self.ratio_name} gauge"]
+        for cache in caches:
+            hits = values.get((cache, "hit"), 0)
+            total = hits + values.get((cache, "miss"), 0)
+            lines.append(f'{self.ratio_name}{{cache="{cache}"}} {hits / total}')
+        return lines
+
+
+# Shared pipeline instruments, see GitHubSummaryAgent.assist and the actions
+STAGE_LATENCY = Summary("agent_stage_seconds",
+                        "Latency of each agent pipeline stage", ("stage",))
+STAGE_BUCKETS = Histogram("agent_stage_duration_seconds",
+                          "Latency of each agent pipeline stage", ("stage",))
+IN_PROGRESS   = Gauge("agent_in_progress", "Work currently in flight", ("what",))
+CACHE         = CacheStats("agent_cache_lookups_total", "Cache lookups",
+                           "agent_cache_hit_ratio")
+
+
+@contextmanager
+def stage(name: str):
+    """Times one pipeline stage into both the summary and the histogram."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_LATENCY.observe(elapsed, stage=name)
+        STAGE_BUCKETS.observe(elapsed, stage=name)
+
+
+def render() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
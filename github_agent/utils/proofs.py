@@ -0,0 +1,72 @@
+# github_agent/utils/proofs.py
+import re, json, hashlib
+from pathlib import Path
+from functools import lru_cache
+
+from github_agent.utils.canonical import canonicalize, CANON_VERSION
+from github_agent.utils.merkle import verify_proof
+from github_agent.utils.merkle_store import MerkleTreeFile
+
+SESSION_RE = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+def entry_digest(entry: dict) -> str:
+    """
+    Recomputes an execution-log entry hash the way _record does, using the
+    canonicalization named in entry["canon"] (legacy entries have none).
+    """
+    body = {k: v for k, v in entry.items() if k != "hash"}
+    canon = entry.get("canon")
+    if canon == CANON_VERSION:
+        data = canonicalize(body)
+    elif canon is None:
+        data = json.dumps(body, sort_keys=True).encode()
+    else:
+        raise ValueError(f"unknown canonicalization {canon!r}")
+    return hashlib.sha256(data).hexdigest()
+
+
+def verify(entry: dict, proof: list[dict], root: str) -> bool:
+    """
+    Standalone inclusion check for one entry: rehashes it, compares with
+    its recorded hash (if any) and folds the audit path up to `root`.
+    """
+    digest = entry_digest(entry)
+    if entry.get("hash", digest) != digest:
+        return False
+    return verify_proof(digest, proof, root)
+
+
+@lru_cache(maxsize=64)
+def _open_tree(path: str, mtime_ns: int) -> MerkleTreeFile:
+    # keyed on mtime so a re-finalized session is picked up
+    return MerkleTreeFile(path)
+
+
+class ProofStore:
+    """
+    Serves inclusion proofs for finalized sessions stored as
+    <root>/<session>/execution_tree.bin. Tree files stay memory-mapped; a
+    proof reads O(log n) nodes from the map, so proofs are not cached.
+    """
+
+    def __init__(self, root: str = "proofs"):
+        self.root = Path(root)
+
+    def tree(self, session: str) -> MerkleTreeFile:
+        if not SESSION_RE.match(session) or session in (".", ".."):
+            raise KeyError(session)
+        path = self.root / session / "execution_tree.bin"
+        if not path.exists():
+            raise KeyError(session)
+        return _open_tree(str(path), path.stat().st_mtime_ns)
+
+    def prove(self, session: str, index: int) -> dict:
+        tree = self.tree(session)
+        return {
+            "index": index,
+            "leaf": tree.node(0, index).hex(),
+            "proof": tree.proof(index),
+            "root": tree.root.hex(),
+            "session": session,
+        }
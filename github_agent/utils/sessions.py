@@ -0,0 +1,162 @@
+# github_agent/utils/sessions.py
+import json, time, uuid, atexit, hashlib, logging, threading
+from collections import deque
+from pathlib import Path
+
+from github_agent.utils.canonical import canonicalize
+from github_agent.utils.execution_logger import ExecutionLogger
+from github_agent.utils.merkle import MerkleAccumulator
+from github_agent.utils.merkle_store import write_tree
+from github_agent.utils.proofs import SESSION_RE
+
+logger = logging.getLogger(__name__)
+
+# Two-level commitment:
+#
+#   session   one ExecutionLogger per assist() call, in <root>/<session>/,
+#             with its own entries, tree and root (served by ProofStore)
+#   window    every `window` seconds the roots of the sessions that finished
+#             since the last seal are hashed into a root-of-roots, written
+#             to <root>/roots/<window start>[-w<worker>].json (+ .bin tree)
+#
+# A window leaf is sha256 of the canonical {"session", "root", "leaf_count"}
+# object, so a session root can be proven against the window root with the
+# same proof format as single entries.
+
+
+def session_leaf(session: str, root: str, leaf_count: int) -> bytes:
+    return hashlib.sha256(canonicalize(
+        {"session": session, "root": root, "leaf_count": leaf_count})).digest()
+
+
+class SessionLogs:
+    """
+    Creates one ExecutionLogger per session and commits their roots per time
+    window. Sessions never share a logger, so recording takes no
+    process-wide lock; finished roots go to a deque (append is atomic). A
+    timer seals each window at its boundary, and a close() that notices a
+    new window first seals the previous one, so a session is always
+    committed under the window it finished in.
+    """
+
+    def __init__(self, agent_did: str, root="proofs", window: float = 300,
+                 worker: int | None = None, **logger_kwargs):
+        self.agent_did = agent_did
+        self.root = Path(root)
+        self.roots_dir = self.root / "roots"
+        self.window = window
+        self.suffix = "" if worker is None else f"-w{worker}"
+        self.logger_kwargs = logger_kwargs
+        self.finished: deque = deque()
+        self.window_id = int(time.time() // window)
+        self.sealing = threading.Lock()
+        self.timer = None
+        self._arm()
+        atexit.register(self.shutdown)
+
+    def _arm(self):
+        delay = (self.window_id + 1) * self.window - time.time()
+        self.timer = threading.Timer(max(delay, 0), self._due)
+        self.timer.daemon = True
+        self.timer.start()
+
+    def _due(self):
+        # quiet period: the window is sealed even if no session closes
+        try:
+            self.roll()
+        except Exception:
+            logger.exception("window seal failed")
+        self._arm()
+
+    def session_id(self, session=None, query=None) -> str:
+        sid = str(getattr(query, "id", "") or "")
+        if not SESSION_RE.match(sid) or sid in (".", "..") or sid in ("roots", "blobs"):
+            sid = uuid.uuid4().hex
+        if (self.root / sid).exists():
+            # a retried query id must not overwrite a finalized session
+            sid = f"{sid}.{uuid.uuid4().hex[:8]}"
+        return sid
+
+    def open(self, session=None, query=None) -> ExecutionLogger:
+        sid = self.session_id(session, query)
+        return ExecutionLogger(self.agent_did, out_dir=self.root / sid,
+                               session=sid, **self.logger_kwargs)
+
+    def close(self, log: ExecutionLogger) -> str | None:
+        """
+        Finalizes `log` (blocking) and queues its root for the window.
+        Returns None, and commits nothing, if finalizing failed.
+        """
+        try:
+            root, _ = log.finalize()
+        except Exception:
+            # without its tree, trace and CAR the session could never be
+            # proven, so its root stays out of the window
+            logger.exception(f"session {log.session} not finalized")
+            root = None
+        self.roll()
+        if root is not None:
+            self.finished.append((time.time(), log.session, root,
+                                  log.tree.count))
+        return root
+
+    def roll(self) -> Path | None:
+        """Seals the previous window if the clock has moved past it."""
+        window_id = int(time.time() // self.window)
+        if window_id != self.window_id:
+            return self.seal(until=window_id * self.window)
+        return None
+
+    def shutdown(self):
+        if self.timer is not None:
+            self.timer.cancel()
+        self.roll()
+        self.seal()
+
+    def seal(self, until: float | None = None) -> Path | None:
+        """
+        Commits the sessions finished before `until` (default: every session
+        finished so far) to one window root.
+        """
+        if not self.sealing.acquire(blocking=False):
+            return None    # another thread is sealing
+        try:
+            window_id = self.window_id
+            self.window_id = int((time.time() if until is None else until)
+                                 // self.window)
+            n = len(self.finished)
+            sessions = [self.finished.popleft() for _ in range(n)]
+            if until is not None:
+                # finished after the boundary: they belong to the next window
+                later = [s for s in sessions if s[0] >= until]
+                sessions = [s for s in sessions if s[0] < until]
+                self.finished.extendleft(reversed(later))
+            if not sessions:
+                return None
+            tree = MerkleAccumulator()
+            for _, sid, root, count in sessions:
+                tree.append(session_leaf(sid, root, count))
+
+            self.roots_dir.mkdir(parents=True, exist_ok=True)
+            name = base = f"{int(window_id * self.window)}{self.suffix}"
+            part = 0
+            while (self.roots_dir / f"{name}.json").exists():
+                # sealed early (seal() called directly), then again
+                part += 1
+                name = f"{base}.{part}"
+            path = self.roots_dir / f"{name}.json"
+            write_tree(self.roots_dir / f"{name}.bin", tree)
+            tmp = path.with_suffix(".json.tmp")
+            tmp.write_text(json.dumps({
+                "root": tree.root_hex(),
+                "window": [window_id * self.window,
+                           (window_id + 1) * self.window],
+                "sessions": [{"session": sid, "root": root, "leaf_count": count,
+                              "finished": ts}
+                             for ts, sid, root, count in sessions],
+                "tree": f"{name}.bin",
+            }, indent=2))
+            tmp.replace(path)
+            return path
+        finally:
+            self.sealing.release()
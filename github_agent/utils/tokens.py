@@ -0,0 +1,81 @@
+# github_agent/utils/tokens.py
+import os
+from contextlib import contextmanager
+from functools import lru_cache
+
+import tiktoken
+from langchain.callbacks import get_openai_callback
+
+from github_agent.utils.metrics import Counter
+
+# Token ceiling for one assist() call; 0 disables the guard
+TOKEN_BUDGET = int(os.getenv("TOKEN_BUDGET", 0))
+# USD per 1K embedding tokens (text-embedding-ada-002 list price)
+EMBED_PRICE_PER_1K = float(os.getenv("EMBED_PRICE_PER_1K", 0.0001))
+
+TOKENS = Counter("agent_tokens_total", "Model tokens used",
+                 ("kind", "stage", "repo"))
+COST   = Counter("agent_cost_usd_total", "Estimated model spend in USD",
+                 ("repo",))
+
+@lru_cache(maxsize=1)
+def _encoding():
+    # loaded on first use: a cold tiktoken cache fetches the BPE file
+    return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str) -> int:
+    return len(_encoding().encode(text, disallowed_special=()))
+
+
+class TokenLedger:
+    """
+    Token usage of one assist() call, broken down by repo and stage.
+    Completion usage comes from the OpenAI callback; embedding usage is
+    counted locally with tiktoken since the embeddings client reports none.
+    """
+
+    def __init__(self, budget: int = TOKEN_BUDGET):
+        self.budget = budget
+        self.usage: dict[tuple[str, str], dict] = {}
+
+    def add(self, repo: str, stage: str, prompt: int = 0, completion: int = 0,
+            embedding: int = 0, cost: float = 0.0):
+        u = self.usage.setdefault((repo, stage), {
+            "prompt": 0, "completion": 0, "embedding": 0, "cost_usd": 0.0})
+        u["prompt"] += prompt
+        u["completion"] += completion
+        u["embedding"] += embedding
+        u["cost_usd"] += cost
+        for kind, n in (("prompt", prompt), ("completion", completion),
+                        ("embedding", embedding)):
+            if n:
+                TOKENS.inc(n, kind=kind, stage=stage, repo=repo)
+        if cost:
+            COST.inc(cost, repo=repo)
+
+    @contextmanager
+    def llm(self, repo: str, stage: str):
+        """Attributes every OpenAI completion inside the block."""
+        with get_openai_callback() as cb:
+            yield
+        self.add(repo, stage, prompt=cb.prompt_tokens,
+                 completion=cb.completion_tokens, cost=cb.total_cost)
+
+    def embedding(self, repo: str, stage: str, texts: list[str]):
+        n = sum(count_tokens(t) for t in texts)
+        self.add(repo, stage, embedding=n, cost=n / 1000 * EMBED_PRICE_PER_1K)
+
+    def total(self) -> int:
+        return sum(u["prompt"] + u["completion"] + u["embedding"]
+                   for u in self.usage.values())
+
+    def would_exceed(self, estimate: int) -> bool:
+        return bool(self.budget) and self.total() + estimate > self.budget
+
+    def to_json(self) -> dict:
+        by_repo: dict[str, dict] = {}
+        for (repo, stage), u in self.usage.items():
+            by_repo.setdefault(repo, {})[stage] = dict(u)
+        return {"total_tokens": self.total(), "budget": self.budget,
+                "repos": by_repo}
@@ -0,0 +1,127 @@
+# github_agent/utils/trace_index.py
+import json, sqlite3, threading
+from functools import lru_cache
+from pathlib import Path
+
+from github_agent.utils.entry_store import iso
+from github_agent.utils.trace_segments import ZstdSegmentReader
+
+# One SQLite table over every session's entries. Rows are written while
+# entries are recorded (batched, WAL mode so several worker processes can
+# share one file); `segment`/`offset`/`length` locate the stored line so
+# a query reads just those bytes instead of parsing whole traces.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    session TEXT    NOT NULL,
+    seq     INTEGER NOT NULL,   -- entry number = leaf index in the tree
+    type    TEXT    NOT NULL,
+    label   TEXT,
+    ts      INTEGER NOT NULL,   -- ns since the Unix epoch, UTC
+    digest  BLOB    NOT NULL,
+    segment TEXT,               -- file name inside the session directory
+    offset  INTEGER,            -- byte offset (uncompressed for .zst)
+    length  INTEGER,
+    PRIMARY KEY (session, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS entries_type_ts ON entries (type, ts);
+CREATE INDEX IF NOT EXISTS entries_label ON entries (label, ts);
+CREATE INDEX IF NOT EXISTS entries_session_ts ON entries (session, ts);
+"""
+
+
+class TraceIndex:
+    """Thread-safe, batched writer and query helper for the entry index."""
+
+    def __init__(self, path="proofs/trace_index.sqlite", batch: int = 500):
+        self.path = str(path)
+        self.batch = batch
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path, check_same_thread=False,
+                                  timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+        self.pending: list[tuple] = []
+        self.lock = threading.Lock()
+
+    def add(self, session: str, seq: int, type: str, label, ts_ns: int,
+            digest: bytes, segment=None, offset=None, length=None):
+        row = (session, seq, type, label, ts_ns, digest, segment, offset, length)
+        with self.lock:
+            self.pending.append(row)
+            if len(self.pending) >= self.batch:
+                self._flush()
+
+    def _flush(self):
+        if self.pending:
+            with self.db:
+                self.db.executemany(
+                    "INSERT OR REPLACE INTO entries VALUES (?,?,?,?,?,?,?,?,?)",
+                    self.pending)
+            self.pending = []
+
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    def locate(self, session: str, rows):
+        """Sets (segment, offset, length) for entries written at finalize()."""
+        with self.lock:
+            self._flush()
+            with self.db:
+                self.db.executemany(
+                    "UPDATE entries SET segment=?, offset=?, length=? "
+                    "WHERE session=? AND seq=?",
+                    ((seg, off, n, session, seq) for seq, seg, off, n in rows))
+
+    def query(self, session=None, type=None, label=None, since=None,
+              until=None, limit=None) -> list[dict]:
+        """Matching rows in (session, seq) order; since/until are ns."""
+        where, args = [], []
+        for column, op, value in (("session", "=", session), ("type", "=", type),
+                                  ("label", "=", label), ("ts", ">=", since),
+                                  ("ts", "<", until)):
+            if value is not None:
+                where.append(f"{column} {op} ?")
+                args.append(value)
+        sql = "SELECT * FROM entries"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY session, seq"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        self.flush()
+        cur = self.db.execute(sql, args)
+        names = [d[0] for d in cur.description]
+        rows = []
+        for values in cur:
+            row = dict(zip(names, values))
+            row["timestamp"] = iso(row.pop("ts"))
+            row["digest"] = row["digest"].hex()
+            rows.append(row)
+        return rows
+
+    def close(self):
+        self.flush()
+        self.db.close()
+
+
+@lru_cache(maxsize=16)
+def _segment_reader(path: str) -> ZstdSegmentReader:
+    return ZstdSegmentReader.from_file(path)
+
+
+def read_entry(root, row: dict) -> dict | None:
+    """Loads the entry a query row points at from <root>/<session>/<segment>."""
+    if row["segment"] is None:
+        return None     # session not finalized yet
+    path = Path(root) / row["session"] / row["segment"]
+    if row["segment"].endswith(".zst"):
+        line = _segment_reader(str(path)).at_offset(row["offset"])
+    else:
+        with open(path, "rb") as f:
+            f.seek(row["offset"])
+            line = f.read(row["length"])
+    return json.loads(line)
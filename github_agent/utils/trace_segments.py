@@ -0,0 +1,241 @@
+# github_agent/utils/trace_segments.py
+import os, struct, threading
+from bisect import bisect_right
+from pathlib import Path
+
+from github_agent.utils.trace_writer import DURABILITY
+
+try:
+    import zstandard
+except ImportError:  # optional: only needed for compressed traces
+    zstandard = None
+
+# Compressed, seekable trace segments.
+#
+# <prefix>-NNNNN.jsonl.zst is a sequence of independent zstd frames, each
+# holding up to `frame_entries` JSONL lines (the whole file still
+# decompresses with plain `zstd -d`). Next to it, <prefix>-NNNNN.idx has
+# one fixed-size record per frame:
+#
+#   first entry u64 | entries u32 | compressed offset u64 | compressed size u32
+#   | raw offset u64 | raw size u32
+#
+# so a reader maps an entry number (or a raw byte offset) to one frame,
+# fetches just those bytes (e.g. with an HTTP Range request against an
+# IPFS gateway) and decompresses them on their own.
+
+INDEX_MAGIC = b"VATIDX1\0"
+FRAME = struct.Struct("<QIQIQI")
+
+
+def _require_zstd():
+    if zstandard is None:
+        raise RuntimeError("compressed traces need the 'zstandard' package")
+
+
+class ZstdTraceWriter:
+    """
+    Drop-in alternative to JsonlTraceWriter. Lines are buffered until a
+    frame is full, then compressed, appended and indexed; `durability`
+    ("none" / "batch" / "always") decides whether each sealed frame is
+    fsynced. append() returns offsets into the *uncompressed* segment.
+    sync_to(n) seals the open frame if it holds any of the first n entries
+    and fsyncs outside the writer's lock, so appends are not held up.
+    """
+
+    def __init__(self, out_dir, prefix: str = "execution_trace",
+                 durability: str = "batch", frame_entries: int = 256,
+                 frame_bytes: int = 1024 * 1024, level: int = 3,
+                 max_segment_bytes: int = 64 * 1024 * 1024):
+        _require_zstd()
+        if durability not in DURABILITY:
+            raise ValueError(f"durability must be one of {DURABILITY}")
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.prefix = prefix
+        self.durability = durability
+        self.frame_entries = frame_entries
+        self.frame_bytes = frame_bytes
+        self.max_segment_bytes = max_segment_bytes
+        self.cctx = zstandard.ZstdCompressor(level=level)
+        self.segments: list[Path] = []
+        self.indexes: list[Path] = []
+        self.entries = 0          # entries written across all segments
+        self.buffer: list[bytes] = []
+        self.buffered = 0
+        self.first = 0            # entry number of buffer[0]
+        self.synced = 0           # entries known to be on disk
+        self.lock = threading.Lock()
+        self._open_segment()
+
+    def _open_segment(self):
+        n = len(self.segments)
+        path = self.out_dir / f"{self.prefix}-{n:05d}.jsonl.zst"
+        index = self.out_dir / f"{self.prefix}-{n:05d}.idx"
+        self.file = open(path, "wb")
+        self.index = open(index, "wb")
+        self.index.write(INDEX_MAGIC)
+        self.size = 0             # compressed bytes in this segment
+        self.raw_size = 0         # uncompressed bytes in this segment
+        self.segments.append(path)
+        self.indexes.append(index)
+
+    def _seal(self, sync: bool = True):
+        if not self.buffer:
+            return
+        raw = b"".join(self.buffer)
+        frame = self.cctx.compress(raw)
+        self.file.write(frame)
+        self.index.write(FRAME.pack(self.first, len(self.buffer), self.size,
+                                    len(frame), self.raw_size - len(raw),
+                                    len(raw)))
+        self.size += len(frame)
+        self.buffer, self.buffered = [], 0
+        self.first = self.entries
+        if sync and self.durability != "none":
+            for f in (self.file, self.index):
+                f.flush()
+                os.fsync(f.fileno())
+            self.synced = self.entries
+
+    def append(self, line: bytes) -> tuple[str, int, int]:
+        with self.lock:
+            return self._append(line)
+
+    def _append(self, line: bytes) -> tuple[str, int, int]:
+        if self.size >= self.max_segment_bytes and not self.buffer:
+            self._close()
+            self._open_segment()
+        offset = self.raw_size
+        self.buffer.append(line + b"\n")
+        self.buffered += len(line) + 1
+        self.raw_size += len(line) + 1
+        self.entries += 1
+        name = self.segments[-1].name
+        if (self.durability == "always" or len(self.buffer) >= self.frame_entries
+                or self.buffered >= self.frame_bytes):
+            self._seal()
+        return name, offset, len(line)
+
+    def sync_to(self, entries: int):
+        with self.lock:
+            if self.synced >= entries or self.file.closed:
+                return
+            if self.first < entries:
+                self._seal(sync=False)
+            self.file.flush()
+            self.index.flush()
+            if self.durability == "none":
+                return
+            # earlier segments were synced when they were closed
+            fds = [os.dup(f.fileno()) for f in (self.file, self.index)]
+            upto = self.first
+        try:
+            for fd in fds:
+                os.fsync(fd)
+        finally:
+            for fd in fds:
+                os.close(fd)
+        with self.lock:
+            self.synced = max(self.synced, upto)
+
+    def flush(self):
+        with self.lock:
+            self._seal()
+            self.file.flush()
+            self.index.flush()
+
+    def close(self):
+        with self.lock:
+            self._close()
+
+    def _close(self):
+        if not self.file.closed:
+            self._seal()
+            for f in (self.file, self.index):
+                f.flush()
+                os.fsync(f.fileno())
+                f.close()
+            self.synced = self.entries
+
+
+class ZstdSegmentReader:
+    """
+    Random access into one compressed segment. `read_range(offset, size)`
+    returns bytes of the .jsonl.zst file, so the segment can live on local
+    disk (from_file) or behind any server that honours Range requests.
+    """
+
+    def __init__(self, index: bytes, read_range):
+        _require_zstd()
+        if index[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+            raise ValueError("not a trace segment index")
+        body = index[len(INDEX_MAGIC):]
+        self.frames = [FRAME.unpack_from(body, i)
+                       for i in range(0, len(body) - len(body) % FRAME.size,
+                                      FRAME.size)]
+        self.firsts = [f[0] for f in self.frames]
+        self.raw_offsets = [f[4] for f in self.frames]
+        self.read_range = read_range
+        self.dctx = zstandard.ZstdDecompressor()
+
+    @classmethod
+    def from_file(cls, segment, index=None):
+        segment = Path(segment)
+        index = Path(index) if index else segment.with_name(
+            segment.name.replace(".jsonl.zst", ".idx"))
+
+        def read_range(offset, size):
+            with open(segment, "rb") as f:
+                f.seek(offset)
+                return f.read(size)
+
+        return cls(index.read_bytes(), read_range)
+
+    @classmethod
+    def from_url(cls, segment_url: str, index_url: str, session=None):
+        import requests
+        http = session or requests.Session()
+
+        def read_range(offset, size):
+            res = http.get(segment_url, timeout=60, headers={
+                "Range": f"bytes={offset}-{offset + size - 1}"})
+            res.raise_for_status()
+            return res.content
+
+        res = http.get(index_url, timeout=60)
+        res.raise_for_status()
+        return cls(res.content, read_range)
+
+    def __len__(self):
+        if not self.frames:
+            return 0
+        last = self.frames[-1]
+        return last[0] + last[1] - self.frames[0][0]
+
+    def _frame_lines(self, i: int) -> list[bytes]:
+        _, count, offset, size, _, raw_size = self.frames[i]
+        raw = self.dctx.decompress(self.read_range(offset, size),
+                                   max_output_size=raw_size)
+        return raw.split(b"\n")[:count]
+
+    def entry(self, n: int) -> bytes:
+        """Line for global entry number `n`."""
+        i = bisect_right(self.firsts, n) - 1
+        if i < 0 or n >= self.firsts[i] + self.frames[i][1]:
+            raise IndexError(f"entry {n} is not in this segment")
+        return self._frame_lines(i)[n - self.firsts[i]]
+
+    def at_offset(self, offset: int) -> bytes:
+        """Line starting at uncompressed byte `offset` (see append())."""
+        i = bisect_right(self.raw_offsets, offset) - 1
+        if i < 0:
+            raise IndexError(f"offset {offset} is not in this segment")
+        raw_offset = self.frames[i][4]
+        raw = b"\n".join(self._frame_lines(i)) + b"\n"
+        rel = offset - raw_offset
+        return raw[rel:raw.index(b"\n", rel)]
+
+    def __iter__(self):
+        for i in range(len(self.frames)):
+            yield from self._frame_lines(i)
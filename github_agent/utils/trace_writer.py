@@ -0,0 +1,135 @@
+# github_agent/utils/trace_writer.py
+import os, time, threading
+from pathlib import Path
+
+DURABILITY = ("none", "batch", "always")
+
+
+class JsonlTraceWriter:
+    """
+    Append-only trace storage: one JSON line per entry, written as soon as
+    the entry is recorded, in segments of at most `max_segment_bytes`.
+
+    durability:
+      "none"   – leave flushing to the OS
+      "batch"  – group commit: fsync once per `batch_entries` lines or
+                 `batch_interval` seconds, whichever comes first (a timer
+                 syncs the tail of a burst when no more lines arrive)
+      "always" – fsync after every line
+
+    sync_to(n) makes the first n lines durable from any thread; the fsync
+    itself runs outside the writer's lock, so appends are not held up.
+    """
+
+    def __init__(self, out_dir, prefix: str = "execution_trace",
+                 durability: str = "batch", batch_entries: int = 256,
+                 batch_interval: float = 0.05,
+                 max_segment_bytes: int = 64 * 1024 * 1024):
+        if durability not in DURABILITY:
+            raise ValueError(f"durability must be one of {DURABILITY}")
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.prefix = prefix
+        self.durability = durability
+        self.batch_entries = batch_entries
+        self.batch_interval = batch_interval
+        self.max_segment_bytes = max_segment_bytes
+        self.segments: list[Path] = []
+        self.file = None
+        self.size = 0
+        self.pending = 0
+        self.lines = 0            # lines appended across all segments
+        self.synced = 0           # lines known to be on disk
+        self.last_sync = time.monotonic()
+        self.lock = threading.Lock()
+        self.timer = None
+        self._open_segment()
+
+    def _open_segment(self):
+        path = self.out_dir / f"{self.prefix}-{len(self.segments):05d}.jsonl"
+        self.file = open(path, "ab")
+        self.size = self.file.tell()
+        self.segments.append(path)
+
+    def _sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.pending = 0
+        self.synced = self.lines
+        self.last_sync = time.monotonic()
+
+    def append(self, line: bytes) -> tuple[str, int, int]:
+        """
+        Writes one serialized entry (without trailing newline).
+        Returns (segment name, byte offset, length) of the stored line.
+        """
+        with self.lock:
+            return self._append(line)
+
+    def _append(self, line: bytes) -> tuple[str, int, int]:
+        if self.size and self.size + len(line) + 1 > self.max_segment_bytes:
+            self._sync()
+            self.file.close()
+            self._open_segment()
+        offset = self.size
+        self.file.write(line + b"\n")
+        self.size += len(line) + 1
+        self.lines += 1
+        self.pending += 1
+
+        if self.durability == "always":
+            self._sync()
+        elif self.durability == "batch":
+            if (self.pending >= self.batch_entries
+                    or time.monotonic() - self.last_sync >= self.batch_interval):
+                self._sync()
+            elif self.timer is None:
+                self._arm()
+        return self.segments[-1].name, offset, len(line)
+
+    def _arm(self):
+        self.timer = threading.Timer(self.batch_interval, self._due)
+        self.timer.daemon = True
+        self.timer.start()
+
+    def _due(self):
+        # quiet period: sync the lines no later append will commit
+        with self.lock:
+            self.timer = None
+            lines = self.lines
+        self.sync_to(lines)
+
+    def sync_to(self, lines: int):
+        with self.lock:
+            if self.synced >= lines or self.file.closed:
+                return
+            self.file.flush()
+            if self.durability == "none":
+                return
+            # earlier segments were synced when they were rotated out
+            fd, upto = os.dup(self.file.fileno()), self.lines
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        with self.lock:
+            if upto > self.synced:
+                self.synced = upto
+                self.pending = self.lines - upto
+                self.last_sync = time.monotonic()
+
+    def flush(self):
+        with self.lock:
+            if self.durability == "none":
+                self.file.flush()
+            else:
+                self._sync()
+
+    def close(self):
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if self.file and not self.file.closed:
+                self._sync()
+                self.file.close()
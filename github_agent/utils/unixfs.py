@@ -0,0 +1,222 @@
+# github_agent/utils/unixfs.py
+import hashlib
+from base64 import b32encode, b32decode
+from pathlib import Path
+
+# Offline CIDs for files and directories, identical to what
+# `ipfs add --cid-version=1` (kubo defaults) would return:
+#
+#   chunks    fixed 256 KiB, stored as raw blocks (codec 0x55)
+#   layout    balanced, at most 174 links per node, full subtrees first
+#   nodes     dag-pb (0x70) with a UnixFS File / Directory Data field
+#   CIDs      v1, sha2-256, base32 ("b...")
+#
+# Blocks are handed to an optional `put(cid, block)` callback as they are
+# produced (see car.py), so large files are never held in memory.
+
+CHUNK_SIZE = 256 * 1024
+MAX_LINKS = 174
+RAW = 0x55
+DAG_PB = 0x70
+SHA2_256 = 0x12
+
+# UnixFS Data.Type
+DIRECTORY = 1
+FILE = 2
+
+
+def varint(n: int) -> bytes:
+    out = bytearray()
+    while n >= 0x80:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+    return bytes(out)
+
+
+def _field(num: int, value: bytes) -> bytes:
+    # length-delimited protobuf field
+    return varint(num << 3 | 2) + varint(len(value)) + value
+
+
+def _uint(num: int, value: int) -> bytes:
+    return varint(num << 3) + varint(value)
+
+
+def make_cid(codec: int, block: bytes) -> bytes:
+    """Binary CIDv1 of `block`."""
+    return (varint(1) + varint(codec) + bytes((SHA2_256, 32))
+            + hashlib.sha256(block).digest())
+
+
+def cid_str(cid: bytes) -> str:
+    return "b" + b32encode(cid).decode().lower().rstrip("=")
+
+
+def parse_cid(cid: str) -> bytes:
+    """Binary form of a base32 CIDv1 string."""
+    if not cid.startswith("b"):
+        raise ValueError(f"expected a base32 CIDv1, got {cid!r}")
+    body = cid[1:].upper()
+    return b32decode(body + "=" * (-len(body) % 8))
+
+
+def _read_varint(buf: bytes, i: int) -> tuple[int, int]:
+    n = shift = 0
+    while True:
+        b = buf[i]
+        i += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, i
+        shift += 7
+
+
+def _fields(buf: bytes):
+    i = 0
+    while i < len(buf):
+        key, i = _read_varint(buf, i)
+        if key & 7 == 2:
+            size, i = _read_varint(buf, i)
+            yield key >> 3, buf[i:i + size]
+            i += size
+        elif key & 7 == 0:
+            value, i = _read_varint(buf, i)
+            yield key >> 3, value
+        else:
+            raise ValueError(f"unexpected protobuf wire type {key & 7}")
+
+
+def decode_links(block: bytes) -> list[tuple[str, bytes, int]]:
+    """(name, binary CID, tsize) of every link in a dag-pb block."""
+    links = []
+    for num, link in _fields(block):
+        if num == 2:
+            f = dict(_fields(link))
+            links.append((f.get(2, b"").decode(), f[1], f.get(3, 0)))
+    return links
+
+
+def _pb_node(links, data: bytes) -> bytes:
+    # dag-pb canonical form: Links (field 2) before Data (field 1)
+    out = b"".join(_field(2, _field(1, cid) + _field(2, name.encode())
+                          + _uint(3, tsize))
+                   for cid, name, tsize in links)
+    return out + _field(1, data)
+
+
+class _Link:
+    __slots__ = ("cid", "tsize", "filesize")
+
+    def __init__(self, cid: bytes, tsize: int, filesize: int):
+        self.cid, self.tsize, self.filesize = cid, tsize, filesize
+
+
+class FileBuilder:
+    """
+    Streaming balanced-layout importer: write() bytes in any pieces, then
+    finish() returns (cid, total dag size). levels[k] holds finished
+    subtrees of depth k that are waiting for a parent.
+    """
+
+    def __init__(self, put=None, chunk_size: int = CHUNK_SIZE):
+        self.put = put
+        self.chunk_size = chunk_size
+        self.pending = bytearray()
+        self.levels: list[list[_Link]] = [[]]
+
+    def _emit(self, codec: int, block: bytes) -> bytes:
+        cid = make_cid(codec, block)
+        if self.put is not None:
+            self.put(cid, block)
+        return cid
+
+    def _leaf(self, chunk: bytes):
+        self._add(0, _Link(self._emit(RAW, chunk), len(chunk), len(chunk)))
+
+    def _node(self, children: list[_Link]) -> _Link:
+        filesize = sum(c.filesize for c in children)
+        data = _uint(1, FILE) + _uint(3, filesize) + b"".join(
+            _uint(4, c.filesize) for c in children)
+        block = _pb_node([(c.cid, "", c.tsize) for c in children], data)
+        return _Link(self._emit(DAG_PB, block),
+                     len(block) + sum(c.tsize for c in children), filesize)
+
+    def _add(self, k: int, link: _Link):
+        level = self.levels[k]
+        level.append(link)
+        if len(level) == MAX_LINKS:
+            if k + 1 == len(self.levels):
+                self.levels.append([])
+            children = list(level)
+            level.clear()
+            self._add(k + 1, self._node(children))
+
+    def write(self, data: bytes):
+        self.pending += data
+        while len(self.pending) >= self.chunk_size:
+            self._leaf(bytes(self.pending[:self.chunk_size]))
+            del self.pending[:self.chunk_size]
+
+    def finish(self) -> tuple[bytes, int]:
+        if self.pending or not any(self.levels):
+            self._leaf(bytes(self.pending))
+            self.pending.clear()
+        # a lone first chunk is the file itself
+        if len(self.levels) == 1 and len(self.levels[0]) == 1:
+            leaf = self.levels[0][0]
+            return leaf.cid, leaf.tsize
+        # close the partial subtrees along the right edge, bottom up
+        top = max(k for k, level in enumerate(self.levels) if level)
+        for k in range(len(self.levels)):
+            level = self.levels[k]
+            if k < top and level:
+                if k + 1 == len(self.levels):
+                    self.levels.append([])
+                self.levels[k + 1].append(self._node(level))
+                top = max(top, k + 1)
+            elif k == top:
+                root = level[0] if len(level) == 1 and k > 0 else self._node(level)
+                return root.cid, root.tsize
+        raise AssertionError("unreachable")
+
+
+def add_bytes(data: bytes, put=None) -> tuple[bytes, int]:
+    builder = FileBuilder(put)
+    builder.write(data)
+    return builder.finish()
+
+
+def add_file(path, put=None) -> tuple[bytes, int]:
+    """(cid, dag size) of a file, read in chunk-sized pieces."""
+    builder = FileBuilder(put)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            builder.write(chunk)
+    return builder.finish()
+
+
+def add_directory(entries: dict, put=None) -> tuple[bytes, int]:
+    """
+    Plain (unsharded) UnixFS directory over {name: (cid, dag size)}, as
+    `ipfs add -w` builds for a handful of files.
+    """
+    links = [(cid, name, tsize) for name, (cid, tsize) in sorted(
+        entries.items(), key=lambda kv: kv[0].encode())]
+    block = _pb_node(links, _uint(1, DIRECTORY))
+    cid = make_cid(DAG_PB, block)
+    if put is not None:
+        put(cid, block)
+    return cid, len(block) + sum(t for _, _, t in links)
+
+
+def add_files(paths, put=None, wrap: bool = True) -> dict[str, str]:
+    """
+    CIDs of `paths` keyed by file name; with wrap=True the wrapping
+    directory's CID is included under "directory".
+    """
+    entries = {Path(p).name: add_file(p, put) for p in paths}
+    cids = {name: cid_str(cid) for name, (cid, _) in entries.items()}
+    if wrap:
+        cids["directory"] = cid_str(add_directory(entries, put)[0])
+    return cids
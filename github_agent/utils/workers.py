@@ -0,0 +1,106 @@
+# github_agent/utils/workers.py
+import os, json, time, socket, logging, threading
+import multiprocessing as mp
+from pathlib import Path
+
+import uvicorn
+
+logger = logging.getLogger(__name__)
+
+RUN_DIR = Path(os.getenv("AGENT_RUN_DIR", "run"))
+HEARTBEAT_SECS = float(os.getenv("WORKER_HEARTBEAT", 5))
+
+
+def worker_id() -> int | None:
+    """Index of the current worker process, or None when not supervised."""
+    wid = os.getenv("WORKER_ID")
+    return int(wid) if wid is not None else None
+
+
+def read_health(run_dir: Path = RUN_DIR) -> dict:
+    path = Path(run_dir) / "workers.json"
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def _write_json(path: Path, data: dict):
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(data, indent=2))
+    os.replace(tmp, path)
+
+
+def _heartbeat(wid: int, run_dir: Path):
+    path = run_dir / f"worker-{wid}.json"
+    started = time.time()
+    while True:
+        _write_json(path, {"worker": wid, "pid": os.getpid(),
+                           "started": started, "heartbeat": time.time()})
+        time.sleep(HEARTBEAT_SECS)
+
+
+def _worker_main(wid: int, sock: socket.socket, build_app, run_dir: Path):
+    os.environ["WORKER_ID"] = str(wid)
+    threading.Thread(target=_heartbeat, args=(wid, run_dir),
+                     daemon=True).start()
+    app = build_app(wid)
+    config = uvicorn.Config(app, log_level="info")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def run_workers(build_app, host: str, port: int, workers: int,
+                run_dir: Path = RUN_DIR):
+    """
+    Supervisor: binds host:port once, forks `workers` processes that all
+    accept on the shared socket, restarts any that die and writes their
+    health to <run_dir>/workers.json. `build_app(worker_id)` must return
+    the ASGI app for one worker and is called inside the child.
+    """
+    run_dir = Path(run_dir)
+    run_dir.mkdir(parents=True, exist_ok=True)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    ctx = mp.get_context("fork")
+    procs: dict[int, mp.Process] = {}
+    restarts = {wid: 0 for wid in range(workers)}
+
+    def spawn(wid: int):
+        p = ctx.Process(target=_worker_main, name=f"agent-worker-{wid}",
+                        args=(wid, sock, build_app, run_dir), daemon=True)
+        p.start()
+        procs[wid] = p
+        logger.info(f"Worker {wid} started (pid {p.pid})")
+
+    for wid in range(workers):
+        spawn(wid)
+
+    try:
+        while True:
+            time.sleep(HEARTBEAT_SECS)
+            now = time.time()
+            report = {"supervisor": os.getpid(), "updated": now, "workers": []}
+            for wid, p in sorted(procs.items()):
+                beat = run_dir / f"worker-{wid}.json"
+                last = json.loads(beat.read_text())["heartbeat"] if beat.exists() else None
+                alive = p.is_alive()
+                stale = last is None or now - last > 3 * HEARTBEAT_SECS
+                report["workers"].append({
+                    "worker": wid, "pid": p.pid, "alive": alive,
+                    "healthy": alive and not stale, "last_heartbeat": last,
+                    "restarts": restarts[wid], "exitcode": p.exitcode,
+                })
+                if not alive:
+                    logger.warning(f"Worker {wid} exited ({p.exitcode}), restarting")
+                    restarts[wid] += 1
+                    spawn(wid)
+            _write_json(run_dir / "workers.json", report)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for p in procs.values():
+            p.terminate()
+        for p in procs.values():
+            p.join(timeout=10)
+        sock.close()
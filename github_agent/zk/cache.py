@@ -0,0 +1,92 @@
+# github_agent/zk/cache.py
+import json, time, hashlib
+from contextlib import contextmanager
+from pathlib import Path
+
+from github_agent.utils.metrics import stage as metric_stage
+
+# Content-hash build cache. A manifest.json next to the artifacts records,
+# per stage, the SHA-256 of every input and the outputs it produced. A stage
+# runs again only if an input hash changed or an output is missing. File
+# digests are memoised by (size, mtime_ns), so multi-GB ptau and zkey files
+# are hashed once, not on every call.
+
+
+def file_digest(path, memo: dict | None = None) -> str:
+    path = Path(path)
+    st = path.stat()
+    key = str(path.resolve())
+    if memo is not None and (hit := memo.get(key)) \
+            and hit["size"] == st.st_size and hit["mtime_ns"] == st.st_mtime_ns:
+        return hit["sha256"]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            h.update(chunk)
+    if memo is not None:
+        memo[key] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns,
+                     "sha256": h.hexdigest()}
+    return h.hexdigest()
+
+
+class Manifest:
+    """Stage records plus timings, persisted after every completed stage."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        try:
+            data = json.loads(self.path.read_text())
+        except FileNotFoundError:
+            data = {}
+        self.stages: dict = data.get("stages", {})
+        self.files: dict = data.get("files", {})
+        self.timings: dict = {}
+
+    def digests(self, inputs: dict) -> dict:
+        """{name: Path | bytes | str} -> {name: sha256 hex}"""
+        out = {}
+        for name, value in inputs.items():
+            if isinstance(value, Path):
+                out[name] = file_digest(value, self.files)
+            else:
+                data = value.encode() if isinstance(value, str) else value
+                out[name] = hashlib.sha256(data).hexdigest()
+        return out
+
+    def fresh(self, name: str, inputs: dict, outputs) -> bool:
+        record = self.stages.get(name)
+        return (record is not None
+                and record["inputs"] == self.digests(inputs)
+                and all(Path(p).exists() for p in outputs))
+
+    @contextmanager
+    def stage(self, name: str, inputs: dict, outputs):
+        """
+        Runs the body unless the stage is fresh; yields whether it must run.
+        Timings land in self.timings and the agent_stage_* metrics.
+        """
+        if self.fresh(name, inputs, outputs):
+            self.timings[name] = {"seconds": 0.0, "cached": True}
+            yield False
+            return
+        start = time.perf_counter()
+        with metric_stage("zk_" + name):
+            yield True
+        self.timings[name] = {"seconds": round(time.perf_counter() - start, 3),
+                              "cached": False}
+        self.stages[name] = {"inputs": self.digests(inputs),
+                             "outputs": [Path(p).name for p in outputs]}
+        self.save()
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"stages": self.stages, "files": self.files,
+                                   "timings": self.timings}, indent=2))
+        tmp.replace(self.path)
+
+
+def format_timings(timings: dict) -> str:
+    return "\n".join(
+        f"  {name:<8} {'cached' if t['cached'] else '%.2fs' % t['seconds']}"
+        for name, t in timings.items())
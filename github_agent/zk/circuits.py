@@ -0,0 +1,232 @@
+# github_agent/zk/circuits.py
+import os, json, hashlib, secrets, struct, subprocess
+from pathlib import Path
+
+import requests
+
+from github_agent.zk.cache import Manifest
+
+# Per-depth instances of the MerkleTree(depth) template in
+# circuits/merkleTree.circom, with their Groth16 artifacts cached under
+#
+#   build/zk/merkle-d<depth>-<source hash>/
+#       merkleTree_d<depth>.circom      generated main component
+#       merkleTree_d<depth>.r1cs / .sym
+#       merkleTree_d<depth>_js/merkleTree_d<depth>.wasm
+#       merkleTree_d<depth>_final.zkey
+#       verification_key.json
+#       artifacts.json                  depth, source hash, constraints, ptau
+#       manifest.json                   input hashes per build stage
+#
+# The source hash covers the template, the generated main and the circomlib
+# version, so editing the circuit starts a new directory instead of reusing
+# stale keys. A trace of n leaves uses the smallest depth with 2**depth >= n,
+# padded with zero leaves.
+
+ROOT = Path(__file__).resolve().parents[2]
+CIRCUIT = ROOT / "circuits" / "merkleTree.circom"
+NODE_MODULES = ROOT / "node_modules"
+BUILD_DIR = Path(os.getenv("ZK_BUILD_DIR", ROOT / "build" / "zk"))
+PTAU_DIR = Path(os.getenv("PTAU_DIR", ROOT / "ptau"))
+PTAU_URL = os.getenv(
+    "PTAU_URL",
+    "https://storage.googleapis.com/zkevm/ptau/powersOfTau28_hez_final_{power:02d}.ptau")
+CIRCOM = os.getenv("CIRCOM", "circom")
+SNARKJS = os.getenv("SNARKJS", "snarkjs")
+MAX_DEPTH = int(os.getenv("ZK_MAX_DEPTH", 16))
+
+# BN254 scalar field: circuit signals live here
+SNARK_FIELD = 21888242871839275222246405745257275088548364400416034343698204186575808495617
+
+MIN_DEPTH = 1
+MIN_POWER, MAX_POWER = 8, 28
+
+
+def depth_for(leaf_count: int) -> int:
+    """Smallest supported depth whose tree holds `leaf_count` leaves."""
+    depth = max(MIN_DEPTH, (leaf_count - 1).bit_length())
+    if depth > MAX_DEPTH:
+        raise ValueError(f"{leaf_count} leaves need depth {depth} > "
+                         f"ZK_MAX_DEPTH={MAX_DEPTH}")
+    return depth
+
+
+def leaf_to_field(leaf) -> int:
+    """
+    Leaf -> field element. Digests are bytes or "0x"-prefixed hex; any other
+    string is read as a decimal number, like the signals in input.json.
+    """
+    if isinstance(leaf, (bytes, bytearray)):
+        leaf = int.from_bytes(leaf, "big")
+    elif isinstance(leaf, str):
+        leaf = int(leaf, 16) if leaf[:2].lower() == "0x" else int(leaf, 10)
+    return leaf % SNARK_FIELD
+
+
+def circuit_input(leaves, depth: int | None = None) -> dict:
+    """Witness input for MerkleTree(depth): zero-padded leaves plus count."""
+    values = [leaf_to_field(x) for x in leaves]
+    depth = depth_for(len(values)) if depth is None else depth
+    if len(values) > 1 << depth:
+        raise ValueError(f"{len(values)} leaves do not fit depth {depth}")
+    values += [0] * ((1 << depth) - len(values))
+    return {"leaf": [str(v) for v in values], "count": str(len(leaves))}
+
+
+def main_source(depth: int) -> str:
+    return ("pragma circom 2.2.2;\n\n"
+            f'include "{CIRCUIT.name}";\n\n'
+            f"component main {{public [count]}} = MerkleTree({depth});\n")
+
+
+def _circomlib_version() -> str:
+    try:
+        return json.loads((NODE_MODULES / "circomlib" / "package.json")
+                          .read_text())["version"]
+    except FileNotFoundError:
+        return "unknown"
+
+
+def source_hash(depth: int) -> str:
+    h = hashlib.sha256()
+    for part in (CIRCUIT.read_bytes(), main_source(depth).encode(),
+                 _circomlib_version().encode()):
+        h.update(struct.pack("<Q", len(part)))
+        h.update(part)
+    return h.hexdigest()
+
+
+def r1cs_info(path) -> dict:
+    """Wire/constraint counts from an .r1cs header section."""
+    with open(path, "rb") as f:
+        magic, _version, sections = struct.unpack("<4sII", f.read(12))
+        if magic != b"r1cs":
+            raise ValueError(f"{path}: not an r1cs file")
+        for _ in range(sections):
+            kind, size = struct.unpack("<IQ", f.read(12))
+            if kind != 1:
+                f.seek(size, 1)
+                continue
+            (field_size,) = struct.unpack("<I", f.read(4))
+            f.seek(field_size, 1)
+            wires, outputs, pub_inputs, prv_inputs, _labels, constraints = \
+                struct.unpack("<IIIIQI", f.read(28))
+            return {"wires": wires, "outputs": outputs,
+                    "public_inputs": pub_inputs, "private_inputs": prv_inputs,
+                    "constraints": constraints}
+    raise ValueError(f"{path}: no header section")
+
+
+def ptau_power(info: dict) -> int:
+    # snarkjs needs a domain for every constraint plus one per public signal
+    needed = info["constraints"] + info["outputs"] + info["public_inputs"] + 1
+    power = max(MIN_POWER, (needed - 1).bit_length())
+    if power > MAX_POWER:
+        raise ValueError(f"circuit needs 2**{power} constraints; ptau stops at 28")
+    return power
+
+
+def ptau_file(power: int) -> Path:
+    """Hermez ceremony file for `power`, downloaded into PTAU_DIR once."""
+    path = PTAU_DIR / f"powersOfTau28_hez_final_{power:02d}.ptau"
+    if not path.exists():
+        PTAU_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".part")
+        with requests.get(PTAU_URL.format(power=power), stream=True,
+                          timeout=60) as res:
+            res.raise_for_status()
+            with open(tmp, "wb") as f:
+                for chunk in res.iter_content(1 << 20):
+                    f.write(chunk)
+        tmp.replace(path)
+    return path
+
+
+def run_tool(*cmd):
+    subprocess.run([str(c) for c in cmd], check=True, cwd=ROOT)
+
+
+class MerkleCircuit:
+    """Artifacts of MerkleTree(depth) for the current circuit source."""
+
+    def __init__(self, depth: int, build_dir=BUILD_DIR):
+        self.depth = depth
+        self.name = f"merkleTree_d{depth}"
+        self.hash = source_hash(depth)
+        self.dir = Path(build_dir) / f"merkle-d{depth}-{self.hash[:16]}"
+        self.circom = self.dir / f"{self.name}.circom"
+        self.r1cs = self.dir / f"{self.name}.r1cs"
+        self.wasm = self.dir / f"{self.name}_js" / f"{self.name}.wasm"
+        self.witness_js = self.dir / f"{self.name}_js" / "generate_witness.js"
+        self.zkey = self.dir / f"{self.name}_final.zkey"
+        self.vkey = self.dir / "verification_key.json"
+        self.meta = self.dir / "artifacts.json"
+        self.manifest = Manifest(self.dir / "manifest.json")
+
+    @classmethod
+    def for_leaves(cls, leaf_count: int, **kwargs) -> "MerkleCircuit":
+        return cls(depth_for(leaf_count), **kwargs)
+
+    def generate(self) -> Path:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.circom.write_text(main_source(self.depth))
+        return self.circom
+
+    def compile(self):
+        self.generate()
+        run_tool(CIRCOM, self.circom, "--r1cs", "--wasm", "--sym",
+                 "-o", self.dir, "-l", CIRCUIT.parent, "-l", NODE_MODULES)
+
+    def setup(self, ptau=None):
+        """Groth16 setup with one random contribution; exports the vkey."""
+        info = r1cs_info(self.r1cs)
+        ptau = Path(ptau) if ptau else ptau_file(ptau_power(info))
+        initial = self.dir / f"{self.name}_0000.zkey"
+        run_tool(SNARKJS, "groth16", "setup", self.r1cs, ptau, initial)
+        run_tool(SNARKJS, "zkey", "contribute", initial, self.zkey,
+                 "--name=merkle-d%d" % self.depth, "-e=" + secrets.token_hex(32))
+        initial.unlink()
+        run_tool(SNARKJS, "zkey", "export", "verificationkey", self.zkey, self.vkey)
+        self.meta.write_text(json.dumps({
+            "depth": self.depth, "source_hash": self.hash, **info,
+            "ptau": ptau.name}, indent=2))
+
+    def _setup_record(self) -> dict | None:
+        """The manifest's setup stage, if its keys were made from this r1cs."""
+        record = self.manifest.stages.get("setup")
+        if (record is None
+                or not all(p.exists() for p in (self.zkey, self.vkey, self.meta))
+                or record["inputs"]["r1cs"]
+                != self.manifest.digests({"r1cs": self.r1cs})["r1cs"]):
+            return None
+        return record
+
+    def build(self, ptau=None) -> "MerkleCircuit":
+        """
+        Compiles and sets up again only what the manifest shows changed.
+        Keys made from the current r1cs are kept: the ptau they were set up
+        with is taken from the manifest, so nothing is downloaded, and an
+        explicit `ptau` that differs from it is an error rather than a
+        silent new setup (delete the zkey to set up again).
+        """
+        with self.manifest.stage(
+                "compile",
+                {"template": CIRCUIT, "main": main_source(self.depth),
+                 "circomlib": _circomlib_version()},
+                [self.r1cs, self.wasm]) as run:
+            if run:
+                self.compile()
+        if (record := self._setup_record()) is not None:
+            if ptau and (self.manifest.digests({"ptau": Path(ptau)})["ptau"]
+                         != record["inputs"]["ptau"]):
+                used = json.loads(self.meta.read_text())["ptau"]
+                raise ValueError(f"{self.zkey} was set up with {used}, not "
+                                 f"{ptau}; delete it to run the setup again")
+            self.manifest.timings["setup"] = {"seconds": 0.0, "cached": True}
+            return self
+        ptau = Path(ptau) if ptau else ptau_file(ptau_power(r1cs_info(self.r1cs)))
+        with self.manifest.stage("setup", {"r1cs": self.r1cs, "ptau": ptau},
+                                 [self.zkey, self.vkey, self.meta]) as run:
+            if run:
+                self.setup(ptau)
+        return self
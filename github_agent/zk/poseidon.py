@@ -0,0 +1,125 @@
+# github_agent/zk/poseidon.py
+from functools import lru_cache
+from operator import mul
+
+from github_agent.zk.circuits import SNARK_FIELD, circuit_input, depth_for
+
+# Poseidon over the BN254 scalar field, bit-compatible with circomlib's
+# Poseidon(nInputs) (x^5 S-box, 8 full rounds, circomlib's partial-round
+# counts). Round constants and the Cauchy MDS matrix are regenerated with
+# the reference Grain LFSR instead of being pasted in, so any arity circomlib
+# supports (1..16 inputs) is available.
+#
+# poseidon_many() runs many hashes of one arity round by round, which keeps
+# the per-hash interpreter overhead down when hashing whole tree levels.
+
+P = SNARK_FIELD
+FULL_ROUNDS = 8
+PARTIAL_ROUNDS = [56, 57, 56, 60, 60, 63, 64, 63, 60, 66, 60, 65, 70, 60, 64, 68]
+FIELD_BITS = 254
+
+
+def _grain(t: int, partial: int):
+    """Self-shrinking Grain LFSR bit stream seeded with the parameters."""
+    seed = (f"{1:02b}{0:04b}{FIELD_BITS:012b}{t:012b}"
+            f"{FULL_ROUNDS:010b}{partial:010b}" + "1" * 30)
+    state = [int(b) for b in seed]
+
+    def step():
+        bit = (state[62] ^ state[51] ^ state[38] ^ state[23]
+               ^ state[13] ^ state[0])
+        state.pop(0)
+        state.append(bit)
+        return bit
+
+    for _ in range(160):
+        step()
+    while True:
+        first, second = step(), step()
+        if first:
+            yield second
+
+
+def _take(bits, n: int) -> int:
+    value = 0
+    for _ in range(n):
+        value = (value << 1) | next(bits)
+    return value
+
+
+@lru_cache(maxsize=None)
+def parameters(t: int) -> tuple[list[int], list[list[int]], int]:
+    """(round constants, MDS matrix, partial rounds) for state width t."""
+    if not 2 <= t <= len(PARTIAL_ROUNDS) + 1:
+        raise ValueError(f"Poseidon width {t} outside 2..{len(PARTIAL_ROUNDS) + 1}")
+    partial = PARTIAL_ROUNDS[t - 2]
+    bits = _grain(t, partial)
+    constants = []
+    while len(constants) < (FULL_ROUNDS + partial) * t:
+        c = _take(bits, FIELD_BITS)
+        if c < P:
+            constants.append(c)
+    while True:
+        xs = [_take(bits, FIELD_BITS) % P for _ in range(2 * t)]
+        if len(set(xs)) == 2 * t and all(
+                (x + y) % P for x in xs[:t] for y in xs[t:]):
+            break
+    mds = [[pow(x + y, -1, P) for y in xs[t:]] for x in xs[:t]]
+    return constants, mds, partial
+
+
+def poseidon_many(rows) -> list[int]:
+    """Poseidon of every row (all rows must have the same length)."""
+    rows = [[int(v) % P for v in row] for row in rows]
+    if not rows:
+        return []
+    t = len(rows[0]) + 1
+    if any(len(row) + 1 != t for row in rows):
+        raise ValueError("poseidon_many: rows must have the same length")
+    constants, mds, partial = parameters(t)
+    half = FULL_ROUNDS // 2
+    states = [[0] + row for row in rows]
+    for r in range(FULL_ROUNDS + partial):
+        rc = constants[r * t:(r + 1) * t]
+        # values stay unreduced between the constant add and pow()/MDS
+        if r < half or r >= half + partial:
+            for k, s in enumerate(states):
+                s = [pow(a + c, 5, P) for a, c in zip(s, rc)]
+                states[k] = [sum(map(mul, row, s)) % P for row in mds]
+        else:
+            c0, rest = rc[0], rc[1:]
+            for k, s in enumerate(states):
+                s = [pow(s[0] + c0, 5, P)] + [a + c for a, c in zip(s[1:], rest)]
+                states[k] = [sum(map(mul, row, s)) % P for row in mds]
+    return [s[0] for s in states]
+
+
+def poseidon(inputs) -> int:
+    return poseidon_many([inputs])[0]
+
+
+def merkle_levels(leaves, depth: int | None = None) -> list[list[int]]:
+    """
+    Every level of the MerkleTree(depth) circuit's tree, leaves first:
+    leaves are mapped into the field and zero-padded like circuit_input().
+    """
+    values = [int(v) for v in circuit_input(leaves, depth)["leaf"]]
+    levels, zero, real = [values], 0, len(leaves)
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        # padding subtrees are all equal: hash each level's zero node once
+        real = (real + 1) // 2
+        nodes = poseidon_many(zip(level[0:2 * real:2], level[1:2 * real:2]))
+        zero = poseidon([zero, zero])
+        levels.append(nodes + [zero] * (len(level) // 2 - real))
+    return levels
+
+
+def merkle_root(leaves, depth: int | None = None) -> int:
+    return merkle_levels(leaves, depth)[-1][0]
+
+
+def expected_public(leaves, depth: int | None = None) -> list[str]:
+    """public.json the circuit will produce: [root, count] as decimal strings."""
+    depth = depth_for(len(leaves)) if depth is None else depth
+    return [str(merkle_root(leaves, depth)), str(len(leaves))]
@@ -0,0 +1,104 @@
+# github_agent/zk/prover.py
+import json, time
+from pathlib import Path
+
+from github_agent.utils.merkle_store import MerkleTreeFile
+from github_agent.zk.cache import Manifest
+from github_agent.zk.circuits import MerkleCircuit, circuit_input, run_tool, SNARKJS
+from github_agent.zk.poseidon import expected_public
+from github_agent.zk.prover_client import prove as run_prover
+
+# Finalized execution tree -> Groth16 proof of its Poseidon Merkle root.
+#
+#   <session>/zk/input.json      circuit_input(leaves): padded leaves + count
+#   <session>/zk/witness.wtns    (one-shot mode only)
+#   <session>/zk/proof.json
+#   <session>/zk/public.json     [root, count]
+#   <session>/zk/manifest.json   input hashes and timings per stage
+#
+# Circuit artifacts come from MerkleCircuit.build(), which has its own
+# manifest. Every stage here is keyed by the hashes of its inputs, so
+# proving the same tree with the same keys twice runs nothing. Witness and
+# proof come from the prover daemon if one is listening (PROVER_SOCKET),
+# otherwise from one-shot node/snarkjs runs. With check=True the public
+# signals are compared with the root computed by the Python Poseidon.
+
+
+def latest_session(root) -> Path:
+    """Most recently finalized session directory under a proofs root."""
+    trees = list(Path(root).glob("*/execution_tree.bin"))
+    if not trees:
+        raise FileNotFoundError(f"{root}: no finalized session")
+    return max(trees, key=lambda p: p.stat().st_mtime).parent
+
+
+def tree_leaves(tree) -> list[str]:
+    """0x-hex leaves from a session dir, execution_tree.bin or a tree JSON."""
+    path = Path(tree)
+    if path.is_dir():
+        path = path / "execution_tree.bin"
+    if path.suffix == ".json" and path.with_suffix(".bin").exists():
+        path = path.with_suffix(".bin")
+    if path.suffix == ".bin":
+        with MerkleTreeFile(path) as f:
+            return ["0x" + leaf.hex() for leaf in f.layer(0)] if f.depth else []
+    data = json.loads(path.read_text())
+    leaves = data["layers"][0] if "layers" in data else data.get("leaves")
+    if leaves is not None:
+        # digests are stored as bare hex; leaf_to_field() reads those as decimal
+        return ["0x" + leaf.removeprefix("0x") for leaf in leaves]
+    raise ValueError(f"{path}: no leaves (finalize the session first)")
+
+
+def prove_tree(tree, out_dir=None, ptau=None, verify: bool = True,
+               client=None, check: bool = True) -> dict:
+    """
+    Builds (or reuses) the circuit for the tree's size and proves its root.
+    Returns depth, count, root, proof/public paths and per-stage timings.
+    """
+    leaves = tree_leaves(tree)
+    if not leaves:
+        raise ValueError(f"{tree}: empty execution tree")
+    tree = Path(tree)
+    out = Path(out_dir) if out_dir else (tree if tree.is_dir() else tree.parent) / "zk"
+    circuit = MerkleCircuit.for_leaves(len(leaves)).build(ptau)
+
+    manifest = Manifest(out / "manifest.json")
+    start = time.perf_counter()
+    witness_input = circuit_input(leaves, circuit.depth)
+    input_json = json.dumps(witness_input)
+    manifest.timings["input"] = {"seconds": round(time.perf_counter() - start, 3),
+                                 "cached": False}
+    proof, public = out / "proof.json", out / "public.json"
+
+    mode = "cached"
+    with manifest.stage("prove", {"input": input_json, "wasm": circuit.wasm,
+                                  "zkey": circuit.zkey}, [proof, public]) as run:
+        if run:
+            mode = run_prover(circuit, witness_input, out, client)
+    if mode != "cached":
+        manifest.timings["prove"]["mode"] = mode
+    if verify:
+        with manifest.stage("verify", {"vkey": circuit.vkey, "proof": proof,
+                                       "public": public}, []) as run:
+            if run:
+                run_tool(SNARKJS, "groth16", "verify", circuit.vkey, public, proof)
+
+    manifest.timings = {**circuit.manifest.timings, **manifest.timings}
+    manifest.save()
+    signals = json.loads(public.read_text())
+    if check:
+        start = time.perf_counter()
+        expected = expected_public(leaves, circuit.depth)
+        manifest.timings["check"] = {
+            "seconds": round(time.perf_counter() - start, 3), "cached": False}
+        manifest.save()
+        if signals != expected:
+            raise ValueError(f"{public}: {signals} != expected {expected}")
+    root, count = signals
+    if int(count) != len(leaves):
+        raise ValueError(f"{public}: count {count} != {len(leaves)} leaves")
+    return {"depth": circuit.depth, "count": int(count), "root": root,
+            "proof": str(proof), "public": str(public),
+            "verification_key": str(circuit.vkey),
+            "mode": mode, "timings": manifest.timings}
@@ -0,0 +1,90 @@
+# github_agent/zk/prover_client.py
+import os, json, socket, itertools
+from pathlib import Path
+
+from github_agent.zk.circuits import MerkleCircuit, run_tool, SNARKJS
+
+# Client for scripts/prover_daemon.js (JSON-RPC 2.0, one JSON object per
+# line over a Unix socket). When no daemon is listening, prove() falls back
+# to the one-shot path: `node generate_witness.js` + `snarkjs groth16 prove`.
+
+PROVER_SOCKET = os.getenv("PROVER_SOCKET", "run/prover.sock")
+
+
+class ProverUnavailable(Exception):
+    pass
+
+
+class ProverError(Exception):
+    """The daemon ran the request and reported an error (e.g. bad input)."""
+
+
+class ProverClient:
+    def __init__(self, path=PROVER_SOCKET, timeout: float = 600):
+        self.path = str(path)
+        self.timeout = timeout
+        self.ids = itertools.count(1)
+
+    def call(self, method: str, **params):
+        req = {"jsonrpc": "2.0", "id": next(self.ids), "method": method,
+               "params": params}
+        try:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.path)
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            sock.close()
+            raise ProverUnavailable(f"no prover daemon at {self.path}") from e
+        with sock, sock.makefile("rwb") as f:
+            f.write(json.dumps(req).encode() + b"\n")
+            f.flush()
+            line = f.readline()
+        if not line:
+            raise ProverUnavailable(f"prover at {self.path} closed the connection")
+        reply = json.loads(line)
+        if "error" in reply:
+            raise ProverError(reply["error"]["message"])
+        return reply["result"]
+
+    def available(self) -> bool:
+        try:
+            self.call("status")
+            return True
+        except ProverUnavailable:
+            return False
+
+    def prove(self, circuit: MerkleCircuit, input: dict) -> tuple[dict, list]:
+        result = self.call("prove", wasm=str(circuit.wasm.resolve()),
+                           zkey=str(circuit.zkey.resolve()), input=input)
+        return result["proof"], result["publicSignals"]
+
+
+def prove_oneshot(circuit: MerkleCircuit, input: dict, out) -> tuple[dict, list]:
+    """Witness + proof through fresh node/snarkjs processes and files in `out`."""
+    out = Path(out)
+    inputs, witness = out / "input.json", out / "witness.wtns"
+    proof, public = out / "proof.json", out / "public.json"
+    out.mkdir(parents=True, exist_ok=True)
+    inputs.write_text(json.dumps(input))
+    run_tool("node", circuit.witness_js, circuit.wasm, inputs, witness)
+    run_tool(SNARKJS, "groth16", "prove", circuit.zkey, witness, proof, public)
+    return json.loads(proof.read_text()), json.loads(public.read_text())
+
+
+def prove(circuit: MerkleCircuit, input: dict, out,
+          client: ProverClient | None = None) -> str:
+    """
+    Writes proof.json/public.json to `out` using the daemon if one answers,
+    otherwise one-shot. Returns "daemon" or "oneshot".
+    """
+    out = Path(out)
+    try:
+        proof, public = (client or ProverClient()).prove(circuit, input)
+    except ProverUnavailable:
+        prove_oneshot(circuit, input, out)
+        return "oneshot"
+    out.mkdir(parents=True, exist_ok=True)
+    (out / "input.json").write_text(json.dumps(input))
+    (out / "proof.json").write_text(json.dumps(proof, indent=1))
+    (out / "public.json").write_text(json.dumps(public, indent=1))
+    return "daemon"
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+import gc, hashlib, argparse, tracemalloc
+from datetime import datetime, timedelta
+
+from github_agent.utils.canonical import CANON_VERSION, canonicalize
+from github_agent.utils.entry_store import EntryColumns, to_ns
+
+parser = argparse.ArgumentParser(
+    description="Memory per execution-log entry: list of dicts vs EntryColumns"
+)
+parser.add_argument("-n", type=int, default=200_000)
+args = parser.parse_args()
+
+start = datetime.utcnow()
+
+
+def events(n):
+    # what the agent logs: short texts, small JSON blobs, the odd error
+    for i in range(n):
+        ts = start + timedelta(microseconds=37 * i)
+        if i % 3 == 0:
+            yield ts, "TEXT", {"label": "owner/repo", "text": f"summary {i}"}
+        elif i % 3 == 1:
+            yield ts, "JSON", {"label": "token_usage",
+                               "json": {"prompt": i, "completion": i // 7}}
+        else:
+            yield ts, "ERROR", {"label": "github", "error": f"HTTP 404 #{i}"}
+
+
+def as_dicts(n):
+    out = []
+    for ts, kind, payload in events(n):
+        entry = {"canon": CANON_VERSION, "timestamp": ts.isoformat() + "Z",
+                 "type": kind, "payload": payload}
+        entry["hash"] = hashlib.sha256(canonicalize(entry)).hexdigest()
+        out.append(entry)
+    return out
+
+
+def as_columns(n):
+    out = EntryColumns()
+    for ts, kind, payload in events(n):
+        data = canonicalize(payload)
+        out.append(to_ns(ts), kind, data, hashlib.sha256(data).digest())
+    return out
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    store = build(args.n)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return store, size
+
+
+dicts, before = measure(as_dicts)
+del dicts
+columns, after = measure(as_columns)
+
+print(f"{args.n} entries")
+print(f"  list of dicts   {before / args.n:7.1f} bytes/entry")
+print(f"  EntryColumns    {after / args.n:7.1f} bytes/entry"
+      f"  ({before / after:.1f}x smaller)")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+import asyncio, argparse, tempfile, time
+
+from github_agent.utils.execution_logger import ExecutionLogger
+from github_agent.utils.instrument import (
+    InstrumentedResponseHandler, traced, use_logger,
+)
+
+parser = argparse.ArgumentParser(
+    description="Per-event cost of the instrumentation wrappers (µs)"
+)
+parser.add_argument("-n", type=int, default=50_000)
+parser.add_argument("--background", action="store_true",
+                    help="logger hashes on a worker thread")
+args = parser.parse_args()
+
+SUMMARY = "A concise five-sentence overview of the repository. " * 8
+
+
+class NullHandler:
+    """Stands in for the framework's ResponseHandler: emits go nowhere."""
+
+    async def emit_text_block(self, event_name, content):
+        pass
+
+
+class Tool:
+    @traced("bench_tool")
+    async def traced_run(self, inp):
+        return inp
+
+    async def run(self, inp):
+        return inp
+
+
+def new_logger(tmp):
+    return ExecutionLogger("did:example:bench", out_dir=tmp,
+                           background=args.background,
+                           max_pending=args.n * 2 + 10)
+
+
+async def timed(call, n):
+    start = time.perf_counter()
+    for i in range(n):
+        await call(i)
+    return (time.perf_counter() - start) / n * 1e6
+
+
+async def main():
+    n, tool, rh = args.n, Tool(), NullHandler()
+    payload = {"repo": "owner/name"}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # baselines: the bare call, and the logger alone
+        base_emit = await timed(lambda i: rh.emit_text_block("owner/name", SUMMARY), n)
+        base_tool = await timed(lambda i: tool.run(payload), n)
+        log = new_logger(tmp + "/a")
+
+        async def log_text(i):
+            log.log_text("owner/name", SUMMARY)
+
+        async def log_json(i):
+            log.log_json("bench_tool", {"call": "input", "value": payload})
+
+        log_only = await timed(log_text, n)
+        log_small = await timed(log_json, n)
+        log.flush()
+
+        # decorator with no session logger: the cost when instrumentation is idle
+        idle = await timed(lambda i: tool.traced_run(payload), n)
+
+        log = new_logger(tmp + "/b")
+        proxy = InstrumentedResponseHandler(rh, log)
+        with use_logger(log):
+            emit = await timed(lambda i: proxy.emit_text_block("owner/name", SUMMARY), n)
+            # two entries per call (input + output)
+            call = await timed(lambda i: tool.traced_run(payload), n)
+        log.flush()
+
+    mode = "background" if args.background else "inline"
+    print(f"{n} events, logger {mode}, µs per call")
+    print(f"  emit_text_block  bare {base_emit:6.2f}   proxied {emit:6.2f}"
+          f"   (logger alone {log_only:6.2f})")
+    print(f"  Tool._run        bare {base_tool:6.2f}   traced  {call:6.2f}"
+          f"   (logger alone {log_small:6.2f} x2)   no logger {idle:6.2f}")
+    print(f"  wrapper overhead per recorded event: "
+          f"{emit - base_emit - log_only:6.2f} µs (proxy), "
+          f"{(call - base_tool) / 2 - log_small:6.2f} µs (decorator)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
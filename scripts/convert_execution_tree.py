@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+import argparse
+from pathlib import Path
+
+from github_agent.utils.merkle_store import to_json, from_json
+
+parser = argparse.ArgumentParser(
+    description="Convert execution trees between the binary and hex JSON forms"
+)
+sub = parser.add_subparsers(dest="cmd", required=True)
+p = sub.add_parser("to-json", help="binary tree file -> {root, layers} JSON")
+p.add_argument("src", help="execution_tree.bin, or a session dir holding one")
+p.add_argument("dst", nargs="?", help="default: execution_tree.full.json next to src")
+p = sub.add_parser("from-json", help="{root, layers} JSON -> binary tree file")
+p.add_argument("src")
+p.add_argument("dst", nargs="?", help="default: execution_tree.bin next to src")
+args = parser.parse_args()
+
+src = Path(args.src)
+if args.cmd == "to-json" and src.is_dir():
+    src = src / "execution_tree.bin"
+args.src = src
+args.dst = args.dst or src.with_name(
+    "execution_tree.full.json" if args.cmd == "to-json" else "execution_tree.bin")
+
+if args.cmd == "to-json":
+    data = to_json(args.src, args.dst)
+    print(f"Wrote {len(data['layers'])} layers to {args.dst}, root {data['root']}")
+else:
+    from_json(args.src, args.dst)
+    print("Wrote binary tree to", args.dst)
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+import argparse
+
+from github_agent.zk.cache import format_timings
+from github_agent.zk.circuits import MerkleCircuit, depth_for
+
+parser = argparse.ArgumentParser(
+    description="Generate (and optionally build) the MerkleTree circuit for a depth"
+)
+size = parser.add_mutually_exclusive_group(required=True)
+size.add_argument("--depth", type=int)
+size.add_argument("--leaves", type=int, help="pick the smallest depth that fits")
+parser.add_argument("--build", action="store_true",
+                    help="compile, run the Groth16 setup and export the vkey")
+parser.add_argument("--ptau", help="use this .ptau instead of the Hermez download")
+args = parser.parse_args()
+
+circuit = MerkleCircuit(args.depth if args.depth else depth_for(args.leaves))
+if args.build:
+    circuit.build(args.ptau)
+    print(format_timings(circuit.manifest.timings))
+    print(f"Depth {circuit.depth} artifacts in {circuit.dir}")
+else:
+    print("Wrote", circuit.generate())
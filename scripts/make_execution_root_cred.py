@@ -5,13 +5,30 @@ from datetime import datetime
 from github_agent.identity import AGENT_DID
 from pathlib import Path
 
-parser = argparse.ArgumentParser()
-parser.add_argument("--out", "-o", default="proofs/execution_cred.json")
+parser = argparse.ArgumentParser(
+    description="Unsigned ExecutionRoot VC for one session or one window root"
+)
+parser.add_argument("source", help="session dir (proofs/<session>) or window "
+                                   "root file (proofs/roots/<start>.json)")
+parser.add_argument("--out", "-o", help="default: execution_cred.json in the "
+                                        "session dir / <window>.cred.json")
 args = parser.parse_args()
 
-# Read the root from the Merkle tree file
-tree = json.load(open("proofs/execution_tree.json"))
-root = tree["root"]
+source = Path(args.source)
+if source.is_dir():
+    # Read the root from the session's Merkle tree file
+    tree = json.loads((source / "execution_tree.json").read_text())
+    root = tree["root"]
+    subject = {"executionRoot": root, "session": source.name,
+               "leafCount": tree["leaf_count"]}
+    out = Path(args.out or source / "execution_cred.json")
+else:
+    # root-of-roots over the sessions finished in one window
+    window = json.loads(source.read_text())
+    root = window["root"]
+    subject = {"executionRoot": root, "window": window["window"],
+               "sessions": len(window["sessions"])}
+    out = Path(args.out or source.with_suffix(".cred.json"))
 
 cred = {
   "@context": ["https://www.w3.org/2018/credentials/v1"],
@@ -19,8 +36,8 @@ cred = {
   "type":         ["VerifiableCredential","ExecutionRoot"],
   "issuer":       AGENT_DID,
   "issuanceDate": f"{datetime.utcnow().isoformat()}Z",
-  "credentialSubject": {"executionRoot": root}
+  "credentialSubject": subject
 }
 
-Path(args.out).write_text(json.dumps(cred, indent=2))
-print("Wrote unsigned execution VC to", args.out)
\ No newline at end of file
+out.write_text(json.dumps(cred, indent=2))
+print("Wrote unsigned execution VC to", out)
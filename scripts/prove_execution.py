@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+import sys, json, argparse
+from pathlib import Path
+
+from github_agent.zk.cache import format_timings
+from github_agent.zk.circuits import circuit_input, depth_for
+from github_agent.zk.poseidon import expected_public
+from github_agent.zk.prover import latest_session, prove_tree, tree_leaves
+
+parser = argparse.ArgumentParser(
+    description="Prove a finalized execution tree's Poseidon root (Groth16)"
+)
+parser.add_argument("tree", nargs="?", default="proofs",
+                    help="session directory, execution_tree.bin or tree JSON; "
+                         "a proofs root means its latest finalized session")
+parser.add_argument("--out", help="output directory (default <session>/zk)")
+parser.add_argument("--ptau", help="use this .ptau instead of the Hermez download")
+parser.add_argument("--no-verify", action="store_true")
+parser.add_argument("--no-check", action="store_true",
+                    help="skip comparing public.json with the Python Poseidon root")
+parser.add_argument("--expected", action="store_true",
+                    help="only print the expected public signals (no Node)")
+parser.add_argument("--input", help="with --expected: also write the witness input here")
+parser.add_argument("--json", action="store_true", help="print the result as JSON")
+args = parser.parse_args()
+
+tree = Path(args.tree)
+if tree.is_dir() and not (tree / "execution_tree.bin").exists():
+    args.tree = latest_session(tree)
+    print(f"proving session {args.tree}", file=sys.stderr)
+
+if args.expected:
+    leaves = tree_leaves(args.tree)
+    if args.input:
+        with open(args.input, "w") as f:
+            json.dump(circuit_input(leaves), f)
+    print(json.dumps({"depth": depth_for(len(leaves)),
+                      "public": expected_public(leaves)}))
+    raise SystemExit
+
+result = prove_tree(args.tree, args.out, args.ptau, verify=not args.no_verify,
+                    check=not args.no_check)
+if args.json:
+    print(json.dumps(result, indent=2))
+else:
+    print(format_timings(result["timings"]))
+    print(f"✅ depth {result['depth']}, {result['count']} leaves, root {result['root']}")
+    print(f"   {result['proof']}\n   {result['public']}")
@@ -0,0 +1,160 @@
+// Long-lived Groth16 prover. Keeps compiled witness calculators and
+// proving keys in memory and serves JSON-RPC 2.0 over a Unix socket, one
+// JSON object per line:
+//
+//   {"jsonrpc":"2.0","id":1,"method":"prove",
+//    "params":{"wasm":"…/merkleTree_d12.wasm","zkey":"…_final.zkey","input":{…}}}
+//   -> {"jsonrpc":"2.0","id":1,"result":{"proof":{…},"publicSignals":[…],"ms":{…}}}
+//
+// Methods: prove, load (same params minus input), status, shutdown.
+// At most --concurrency proofs run at once; the rest wait in a FIFO queue.
+//
+//   node scripts/prover_daemon.js [--socket run/prover.sock] [--concurrency 2]
+const fs = require("fs");
+const net = require("net");
+const path = require("path");
+
+let snarkjs, WitnessCalculatorBuilder;
+try {
+  snarkjs = require("snarkjs");
+  ({ WitnessCalculatorBuilder } = require("circom_runtime"));
+} catch (err) {
+  // an install from a stale package-lock.json lacks these two
+  console.error(`prover: ${err.message}\n` +
+    "run `npm install` so node_modules (and package-lock.json) include " +
+    "snarkjs and circom_runtime@^0.1.28");
+  process.exit(1);
+}
+
+function arg(name, fallback) {
+  const i = process.argv.indexOf(`--${name}`);
+  return i > 0 ? process.argv[i + 1] : fallback;
+}
+
+const SOCKET = arg("socket", process.env.PROVER_SOCKET || "run/prover.sock");
+const CONCURRENCY = Number(arg("concurrency", process.env.PROVER_CONCURRENCY || 2));
+const MAX_CIRCUITS = Number(arg("max-circuits", process.env.PROVER_MAX_CIRCUITS || 4));
+
+// zkey path -> {key, wc, zkey, loadedAt}; Map order doubles as LRU order
+const circuits = new Map();
+const queue = [];
+let running = 0;
+let served = 0;
+
+function stamp(file) {
+  const st = fs.statSync(file);
+  return `${st.size}:${st.mtimeMs}`;
+}
+
+async function load({ wasm, zkey }) {
+  const key = `${stamp(wasm)}|${stamp(zkey)}`;
+  let c = circuits.get(zkey);
+  if (c && c.key === key) {
+    circuits.delete(zkey);
+    circuits.set(zkey, c);
+    return c;
+  }
+  // (re)load when the files changed on disk, e.g. after a new setup
+  c = {
+    key,
+    wc: await WitnessCalculatorBuilder(fs.readFileSync(wasm)),
+    zkey: { type: "mem", data: new Uint8Array(fs.readFileSync(zkey)) },
+    loadedAt: new Date().toISOString(),
+  };
+  circuits.delete(zkey);
+  circuits.set(zkey, c);
+  while (circuits.size > MAX_CIRCUITS) circuits.delete(circuits.keys().next().value);
+  return c;
+}
+
+async function prove(params) {
+  const t0 = Date.now();
+  const c = await load(params);
+  const t1 = Date.now();
+  const wtns = { type: "mem", data: await c.wc.calculateWTNSBin(params.input, 0) };
+  const t2 = Date.now();
+  const { proof, publicSignals } = await snarkjs.groth16.prove(c.zkey, wtns);
+  const t3 = Date.now();
+  served += 1;
+  return { proof, publicSignals, ms: { load: t1 - t0, witness: t2 - t1, prove: t3 - t2 } };
+}
+
+function schedule(job) {
+  return new Promise((resolve, reject) => {
+    queue.push({ job, resolve, reject });
+    pump();
+  });
+}
+
+function pump() {
+  while (running < CONCURRENCY && queue.length) {
+    const { job, resolve, reject } = queue.shift();
+    running += 1;
+    job().then(resolve, reject).finally(() => {
+      running -= 1;
+      pump();
+    });
+  }
+}
+
+const methods = {
+  prove: (p) => schedule(() => prove(p)),
+  load: async (p) => ({ loadedAt: (await load(p)).loadedAt }),
+  status: async () => ({
+    circuits: [...circuits.keys()], running, queued: queue.length,
+    concurrency: CONCURRENCY, served,
+  }),
+  shutdown: async () => {
+    setImmediate(() => server.close(() => process.exit(0)));
+    return { ok: true };
+  },
+};
+
+async function handle(line, socket) {
+  let req;
+  try {
+    req = JSON.parse(line);
+  } catch (err) {
+    socket.write(JSON.stringify({ jsonrpc: "2.0", id: null,
+      error: { code: -32700, message: "parse error" } }) + "\n");
+    return;
+  }
+  const method = methods[req.method];
+  let reply;
+  if (!method) {
+    reply = { error: { code: -32601, message: `no method ${req.method}` } };
+  } else {
+    try {
+      reply = { result: await method(req.params || {}) };
+    } catch (err) {
+      reply = { error: { code: -32000, message: String(err && err.message || err) } };
+    }
+  }
+  if (!socket.destroyed) {
+    socket.write(JSON.stringify({ jsonrpc: "2.0", id: req.id ?? null, ...reply }) + "\n");
+  }
+}
+
+const server = net.createServer((socket) => {
+  let buf = "";
+  socket.setEncoding("utf8");
+  socket.on("data", (chunk) => {
+    buf += chunk;
+    let i;
+    while ((i = buf.indexOf("\n")) >= 0) {
+      const line = buf.slice(0, i).trim();
+      buf = buf.slice(i + 1);
+      if (line) handle(line, socket);
+    }
+  });
+  socket.on("error", () => {});
+});
+
+fs.mkdirSync(path.dirname(SOCKET), { recursive: true });
+if (fs.existsSync(SOCKET)) fs.unlinkSync(SOCKET);   // stale from a crash
+server.listen(SOCKET, () => {
+  console.log(`prover listening on ${SOCKET} (concurrency ${CONCURRENCY})`);
+});
+for (const sig of ["SIGINT", "SIGTERM"]) {
+  process.on(sig, () => server.close(() => process.exit(0)));
+}
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+import sys, json, argparse
+from datetime import datetime, timezone
+
+from github_agent.utils.entry_store import to_ns
+from github_agent.utils.proofs import ProofStore
+from github_agent.utils.trace_index import TraceIndex, read_entry
+
+parser = argparse.ArgumentParser(
+    description="Query indexed execution-log entries, with inclusion proofs"
+)
+parser.add_argument("--db", default="proofs/trace_index.sqlite")
+parser.add_argument("--root", default="proofs", help="directory holding the sessions")
+parser.add_argument("--session")
+parser.add_argument("--type", help="TEXT, JSON, ERROR, ...")
+parser.add_argument("--label")
+parser.add_argument("--since", help="ISO 8601 (UTC unless it has an offset), inclusive")
+parser.add_argument("--until", help="ISO 8601 (UTC unless it has an offset), exclusive")
+parser.add_argument("--limit", type=int, default=100)
+parser.add_argument("--no-proofs", action="store_true")
+args = parser.parse_args()
+
+
+def ns(value):
+    if not value:
+        return None
+    ts = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if ts.tzinfo is not None:
+        # entry timestamps are naive UTC
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return to_ns(ts)
+
+
+index = TraceIndex(args.db)
+proofs = ProofStore(args.root)
+rows = index.query(session=args.session, type=args.type, label=args.label,
+                   since=ns(args.since), until=ns(args.until), limit=args.limit)
+for row in rows:
+    out = {"row": row, "entry": read_entry(args.root, row)}
+    if not args.no_proofs:
+        try:
+            out["proof"] = proofs.prove(row["session"], row["seq"])
+        except (KeyError, IndexError):
+            out["proof"] = None     # session not finalized yet
+    print(json.dumps(out))
+print(f"{len(rows)} entries", file=sys.stderr)
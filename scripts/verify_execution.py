@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+import os, sys, json, time, argparse
+
+from dotenv import load_dotenv
+
+from github_agent.utils.audit import (
+    GATEWAY, CidSource, LocalSource, Mismatch, check_chain, check_credential,
+    check_tree, iter_entries, rehash,
+)
+
+parser = argparse.ArgumentParser(
+    description="Check a published session end to end: trace -> root -> VC -> chain"
+)
+src = parser.add_mutually_exclusive_group(required=True)
+src.add_argument("--dir", help="local session directory, e.g. proofs/<session>")
+src.add_argument("--cid", help="directory CID from execution_cids.json")
+parser.add_argument("--gateway", default=GATEWAY)
+parser.add_argument("--credential", help="signed executionRoot VC (JSON)")
+parser.add_argument("--chain", action="store_true",
+                    help="compare with IdentityRegistry (RPC_URL, REGISTRY_ADDR)")
+parser.add_argument("--did", help="DID to look up on chain (default: VC issuer)")
+parser.add_argument("--workers", type=int, default=None)
+parser.add_argument("--batch", type=int, default=2048)
+args = parser.parse_args()
+
+
+def main():
+    load_dotenv()
+    source = LocalSource(args.dir) if args.dir else CidSource(args.cid, args.gateway)
+
+    start = time.perf_counter()
+    rebuilt = rehash(iter_entries(source), args.workers, args.batch)
+    secs = time.perf_counter() - start
+    print(f"✅ Rehashed {rebuilt['count']} entries in {secs:.1f}s")
+
+    root = check_tree(source, rebuilt)
+    print(f"✅ executionRoot {root} matches execution_tree.json, "
+          f"{len(rebuilt['blobs'])} referenced blobs match their digests")
+
+    did = args.did
+    if args.credential:
+        issuer = check_credential(json.load(open(args.credential)), root)
+        print(f"✅ Credential signed by {issuer} commits to the root")
+        did = did or issuer
+
+    if args.chain:
+        if not did:
+            raise Mismatch("--chain needs --did or --credential")
+        rpc, registry = os.getenv("RPC_URL"), os.getenv("REGISTRY_ADDR")
+        if not rpc or not registry:
+            print("❌ .env must define RPC_URL and REGISTRY_ADDR")
+            return 2
+        claim = check_chain(did, root, rpc, registry)
+        print(f"✅ On-chain claim by {claim['issuer']} (ts {claim['timestamp']}) matches")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except Mismatch as e:
+        print(f"❌ {e}")
+        sys.exit(1)
@@ -0,0 +1,37 @@
+import hashlib
+
+import pytest
+
+from github_agent.utils.audit import (
+    LocalSource, Mismatch, check_tree, iter_entries, rehash,
+)
+from github_agent.utils.blob_store import BlobStore
+from github_agent.utils.execution_logger import ExecutionLogger
+
+
+@pytest.fixture
+def session(tmp_path):
+    blobs = BlobStore(root=tmp_path / "blobs", threshold=16)
+    log = ExecutionLogger("did:test", tmp_path / "s1", blobs=blobs)
+    log.log_text("big", "x" * 100)
+    log.log_text("small", "y")
+    log.finalize()
+    return LocalSource(tmp_path / "s1"), blobs.path(
+        hashlib.sha256(b"x" * 100).hexdigest())
+
+
+def _check(source):
+    return check_tree(source, rehash(iter_entries(source), workers=1))
+
+
+def test_referenced_blobs_are_checked(session):
+    source, blob = session
+    assert _check(source)
+
+    blob.write_bytes(b"z" * 100)          # swapped content, same reference
+    with pytest.raises(Mismatch, match="does not match its digest"):
+        _check(source)
+
+    blob.unlink()
+    with pytest.raises(Mismatch, match="is missing"):
+        _check(source)
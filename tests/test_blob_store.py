@@ -0,0 +1,56 @@
+import hashlib
+
+import pytest
+
+from github_agent.utils.blob_store import BlobStore, is_ref, ref_digest
+from github_agent.utils.execution_logger import ExecutionLogger
+
+
+@pytest.fixture
+def blobs(tmp_path):
+    return BlobStore(root=tmp_path / "blobs", threshold=16)
+
+
+@pytest.mark.parametrize("payload", [
+    {"$blob": "oops"},
+    {"$blob": "sha256:deadbeef", "size": 3},
+    {"nested": [{"$$blob": 1, "$blob": "sha256:00", "size": 3}]},
+])
+def test_user_blob_keys_are_not_references(blobs, tmp_path, payload):
+    stored = blobs.externalize(payload)
+    assert not is_ref(stored)
+    assert blobs.expand(stored) == payload
+
+    log = ExecutionLogger("did:test", tmp_path / "session", blobs=blobs)
+    log.log_json("x", payload)
+    log.log_text("big", "x" * 100)    # one real reference
+    log.finalize()
+    assert log.blob_refs == {hashlib.sha256(b"x" * 100).hexdigest()}
+    assert (tmp_path / "session" / "execution.car").exists()
+
+
+def test_threshold(blobs):
+    assert blobs.externalize("x" * 15) == "x" * 15
+    ref = blobs.externalize("x" * 16)
+    assert is_ref(ref) and ref["size"] == 16
+    assert blobs.get(ref_digest(ref)) == b"x" * 16
+
+
+def test_externalize_expand_round_trip(blobs):
+    text = "ü" * 40                           # size counts UTF-8 bytes
+    payload = {"a": text, "b": [text, "short", 3, None], "c": {"d": ("y" * 20,)}}
+    stored = blobs.externalize(payload)
+    assert stored["a"] == stored["b"][0] == {
+        "$blob": "sha256:" + hashlib.sha256(text.encode()).hexdigest(),
+        "size": 80}
+    assert stored["b"][1:] == ["short", 3, None]
+    assert blobs.expand(stored) == {**payload, "c": {"d": ["y" * 20]}}
+    # content-addressed: one file per distinct text
+    assert len(list(blobs.root.glob("*/*"))) == 2
+
+
+def test_corrupt_blob_is_rejected(blobs):
+    ref = blobs.externalize("z" * 32)
+    blobs.path(ref_digest(ref)).write_bytes(b"tampered")
+    with pytest.raises(ValueError):
+        blobs.expand(ref)
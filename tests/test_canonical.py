@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from github_agent.utils.canonical import canonicalize
+
+# RFC 8785 section 3.2.2 (values) and 3.2.3 (property sorting)
+
+RFC_VALUES_IN = r'''{
+  "numbers": [333333333.33333329, 1E30, 4.50, 2e-3, 0.000000000000000000000000001],
+  "string": "\u20ac$\u000F\u000aA'\u0042\u0022\u005c\\\"\/",
+  "literals": [null, true, false]
+}'''
+RFC_VALUES_OUT = ('{"literals":[null,true,false],'
+                  '"numbers":[333333333.3333333,1e+30,4.5,0.002,1e-27],'
+                  '"string":"€$\\u000f\\nA\'B\\"\\\\\\\\\\"/"}')
+
+RFC_SORTING_IN = r'''{
+  "\u20ac": "Euro Sign",
+  "\r": "Carriage Return",
+  "\ufb33": "Hebrew Letter Dalet With Dagesh",
+  "1": "One",
+  "\ud83d\ude00": "Emoji: Grinning Face",
+  "\u0080": "Control",
+  "\u00f6": "Latin Small Letter O With Diaeresis"
+}'''
+RFC_SORTING_ORDER = ["\r", "1", "\u0080", "\u00f6", "\u20ac", "\U0001F600", "\ufb33"]
+
+
+def test_rfc8785_values():
+    assert canonicalize(json.loads(RFC_VALUES_IN)) == RFC_VALUES_OUT.encode()
+
+
+def test_rfc8785_property_sorting():
+    out = canonicalize(json.loads(RFC_SORTING_IN))
+    assert list(json.loads(out)) == RFC_SORTING_ORDER
+    assert out.startswith(b'{"\\r":"Carriage Return","1":"One"')
+
+
+def test_non_str_keys_coerced_like_json_dumps():
+    value = {1: 2, "a": {True: None, None: 1.5}}
+    assert canonicalize(value) == b'{"1":2,"a":{"null":1.5,"true":null}}'
+    assert json.loads(canonicalize(value)) == json.loads(json.dumps(value))
+
+
+def test_key_collision_and_bad_key_type():
+    with pytest.raises(ValueError):
+        canonicalize({1: "a", "1": "b"})
+    with pytest.raises(TypeError):
+        canonicalize({(1, 2): "a"})
@@ -0,0 +1,62 @@
+import threading
+
+import pytest
+
+from github_agent.utils.execution_logger import ExecutionLogger
+
+
+def _workers():
+    return [t for t in threading.enumerate() if t.name == "execution-logger"]
+
+
+def test_background_keeps_every_concurrent_entry(tmp_path):
+    log = ExecutionLogger("did:test", tmp_path, background=True)
+
+    def record(k):
+        for i in range(200):
+            log.log_json("t", {"k": k, "i": i})
+
+    threads = [threading.Thread(target=record, args=(k,)) for k in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    log.finalize()
+    assert log.tree.count == 1600 and not log.failed
+
+
+def test_failed_entry_stops_the_worker(tmp_path):
+    before = len(_workers())
+    log = ExecutionLogger("did:test", tmp_path, background=True)
+    log.log_json("x", {"n": 2 ** 60})    # outside the I-JSON range
+    with pytest.raises(RuntimeError, match="entry 0 was not recorded"):
+        log.finalize()
+    assert log.queue is None
+    for t in _workers()[before:]:
+        t.join(timeout=1)
+    assert len(_workers()) == before
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_checkpoint_follows_its_entries_to_disk(tmp_path, compress):
+    if compress:
+        pytest.importorskip("zstandard")
+    from github_agent.utils.trace_segments import ZstdSegmentReader
+    seen = []
+
+    def on_epoch(checkpoint, path):
+        # what a crash right now would leave on disk
+        segment = next(tmp_path.glob("execution_trace-00000.jsonl*"))
+        if compress:
+            stored = len(ZstdSegmentReader.from_file(segment))
+        else:
+            stored = segment.read_bytes().count(b"\n")
+        seen.append((checkpoint["epoch"], checkpoint["count"], stored))
+
+    log = ExecutionLogger("did:test", tmp_path, stream=True, compress=compress,
+                          epoch_entries=5, on_epoch=on_epoch)
+    for i in range(12):
+        log.log_text("t", str(i))
+    log.finalize()
+    assert [s[:2] for s in seen] == [(0, 5), (1, 10), (2, 12)]
+    assert all(stored >= count for _, count, stored in seen)
@@ -0,0 +1,206 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+import pytest
+
+from github_agent.utils.ipfs_publisher import IpfsPublisher
+
+# A stub kubo API: every POST is recorded and answered with the next
+# (status, body) from `replies`; the last reply repeats once it runs out.
+
+ADD_OK = (200, '{"Name":"a.json","Hash":"bafyleaf"}\n'
+               '{"Name":"","Hash":"bafydir"}\n')
+CAR_OK = (200, '{"Root":{"Cid":{"/":"bafyroot"},"PinErrorMsg":""}}\n')
+
+
+class StubApi:
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                url = urlsplit(self.path)
+                stub.calls.append({"endpoint": url.path,
+                                   "params": parse_qs(url.query),
+                                   "body": self._body()})
+                status, text = (stub.replies.pop(0) if len(stub.replies) > 1
+                                else stub.replies[0])
+                data = text.encode()
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _body(self) -> bytes:
+                if "Content-Length" in self.headers:
+                    return self.rfile.read(int(self.headers["Content-Length"]))
+                chunks = []    # requests streams generator bodies chunked
+                while size := int(self.rfile.readline().split(b";")[0], 16):
+                    chunks.append(self.rfile.read(size))
+                    self.rfile.readline()
+                self.rfile.readline()
+                return b"".join(chunks)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def api():
+    stubs = []
+
+    def make(*replies):
+        stubs.append(StubApi(replies))
+        return stubs[-1]
+
+    yield make
+    for stub in stubs:
+        stub.close()
+
+
+@pytest.fixture
+def upload(tmp_path):
+    path = tmp_path / "a.json"
+    path.write_text('{"entries": []}')
+    return path
+
+
+def publisher(api_url, tmp_path, **kwargs):
+    kwargs = {"workers": 1, "backoff": 0.01, "max_backoff": 0.05, **kwargs}
+    return IpfsPublisher(api_url, queue_dir=tmp_path / "queue", **kwargs)
+
+
+def test_add_records_cids(api, tmp_path, upload):
+    stub = api(ADD_OK)
+    pub = publisher(stub.url, tmp_path)
+    pub.submit([upload], kind="add", record=tmp_path / "cids.json")
+    assert pub.join(timeout=5)
+    pub.close()
+
+    assert json.loads((tmp_path / "cids.json").read_text()) == {
+        "a.json": "bafyleaf", "directory": "bafydir"}
+    assert stub.calls[0]["endpoint"] == "/api/v0/add"
+    assert stub.calls[0]["params"]["pin"] == ["true"]
+    assert b'{"entries": []}' in stub.calls[0]["body"]
+    assert not list((tmp_path / "queue").glob("*.json"))
+
+
+def test_client_error_fails_without_retry(api, tmp_path, upload):
+    stub = api((400, "invalid"))
+    pub = publisher(stub.url, tmp_path)
+    job_id = pub.submit([upload], record=tmp_path / "cids.json")
+    assert pub.join(timeout=5)
+    pub.close()
+
+    assert len(stub.calls) == 1
+    failed = json.loads((tmp_path / "queue" / "failed" / f"{job_id}.json")
+                        .read_text())
+    assert failed["error"].startswith("400")
+    assert not (tmp_path / "cids.json").exists()
+    assert not (tmp_path / "queue" / f"{job_id}.json").exists()
+
+
+def test_server_errors_give_up_after_max_attempts(api, tmp_path, upload):
+    stub = api((500, "busy"))
+    pub = publisher(stub.url, tmp_path, max_attempts=3)
+    job_id = pub.submit([upload])
+    while not (tmp_path / "queue" / "failed" / f"{job_id}.json").exists():
+        assert pub.join(timeout=5)
+    pub.close()
+
+    assert len(stub.calls) == 3
+    failed = json.loads((tmp_path / "queue" / "failed" / f"{job_id}.json")
+                        .read_text())
+    assert failed["attempts"] == 3
+
+
+def test_retry_then_success(api, tmp_path, upload):
+    stub = api((503, "starting"), (500, "busy"), ADD_OK)
+    pub = publisher(stub.url, tmp_path)
+    pub.submit([upload], record=tmp_path / "cids.json")
+    while not (tmp_path / "cids.json").exists():
+        assert pub.join(timeout=5)
+    pub.close()
+
+    assert len(stub.calls) == 3
+    assert json.loads((tmp_path / "cids.json").read_text())["a.json"] == "bafyleaf"
+    assert not list((tmp_path / "queue").glob("*.json"))
+
+
+def test_restart_uploads_pending_jobs(api, tmp_path, upload):
+    # first process: the job is persisted but the process dies before any
+    # worker picks it up
+    crashed = publisher("http://127.0.0.1:9", tmp_path, workers=0)
+    job_id = crashed.submit([upload], record=tmp_path / "cids.json")
+    crashed.close()
+    assert (tmp_path / "queue" / f"{job_id}.json").exists()
+
+    stub = api(ADD_OK)
+    pub = publisher(stub.url, tmp_path)
+    assert pub.join(timeout=5)
+    pub.close()
+
+    assert len(stub.calls) == 1
+    assert json.loads((tmp_path / "cids.json").read_text())["a.json"] == "bafyleaf"
+    assert not (tmp_path / "queue" / f"{job_id}.json").exists()
+
+
+def test_restart_keeps_retry_schedule(api, tmp_path, upload):
+    stub = api((500, "busy"), ADD_OK)
+    first = publisher(stub.url, tmp_path, backoff=60, max_backoff=60)
+    job_id = first.submit([upload])
+    assert first.join(timeout=5)
+    first.close()
+    job = json.loads((tmp_path / "queue" / f"{job_id}.json").read_text())
+    assert job["attempts"] == 1 and job["next_at"] > 0
+
+    # the recovered job is not due yet, so the new process does not hammer
+    # the daemon on startup
+    second = publisher(stub.url, tmp_path)
+    assert second.join(timeout=5)
+    second.close()
+    assert len(stub.calls) == 1
+
+
+def test_repin_is_idempotent(api, tmp_path):
+    car = tmp_path / "trace.car"
+    car.write_bytes(b"car bytes")
+    record = tmp_path / "cids.json"
+    stub = api(CAR_OK)
+    pub = publisher(stub.url, tmp_path)
+    for _ in range(2):
+        pub.submit([car], kind="car", record=record)
+        assert pub.join(timeout=5)
+    pub.close()
+
+    assert [c["endpoint"] for c in stub.calls] == ["/api/v0/dag/import"] * 2
+    assert stub.calls[0]["params"]["pin-roots"] == ["true"]
+    assert json.loads(record.read_text()) == {"pinned": ["bafyroot"]}
+    assert not list((tmp_path / "queue").glob("*.json"))
+    assert not list((tmp_path / "queue" / "failed").glob("*.json"))
+
+
+def test_pin_error_is_retried(api, tmp_path):
+    car = tmp_path / "trace.car"
+    car.write_bytes(b"car bytes")
+    stub = api((200, '{"Root":{"Cid":{"/":"bafyroot"},'
+                     '"PinErrorMsg":"datastore full"}}\n'), CAR_OK)
+    pub = publisher(stub.url, tmp_path)
+    pub.submit([car], kind="car", record=tmp_path / "cids.json")
+    while not (tmp_path / "cids.json").exists():
+        assert pub.join(timeout=5)
+    pub.close()
+
+    assert len(stub.calls) == 2
@@ -0,0 +1,7 @@
+from github_agent.utils.metrics import Counter
+
+
+def test_label_values_are_escaped():
+    c = Counter("test_escaped_total", "help", labels=("tool",))
+    c.inc(tool='a"b\\c\nd')
+    assert c.render()[-1] == 'test_escaped_total{tool="a\\"b\\\\c\\nd"} 1'
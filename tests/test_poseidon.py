@@ -0,0 +1,52 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from github_agent.zk.circuits import SNARK_FIELD, circuit_input, leaf_to_field
+from github_agent.zk.poseidon import expected_public, merkle_root, poseidon
+
+KEYS = Path(__file__).resolve().parents[1] / "keys"
+
+# circomlibjs poseidon test vectors
+CIRCOMLIB = [
+    ([1], 18586133768512220936620570745912940619677854269274689475585506675881198879027),
+    ([1, 2], 7853200120776062878684798364095072458815029376092732009249414926327459813530),
+    ([1, 2, 3, 4], 18821383157269793795438455681495246036402687001665670618754263018637548127333),
+]
+
+# root of keys/merkle_input.json through the original 4-leaf circuit
+ROOT_111_444 = 2627613426887678919670906595223549159912332087418882198813349531614684120136
+
+
+@pytest.mark.parametrize("inputs, expected", CIRCOMLIB)
+def test_poseidon_matches_circomlib(inputs, expected):
+    assert poseidon(inputs) == expected
+
+
+def test_merkle_root_of_int_leaves():
+    assert merkle_root([111, 222, 333, 444]) == ROOT_111_444
+    assert expected_public([111, 222, 333, 444]) == [str(ROOT_111_444), "4"]
+
+
+def test_reproduces_keys_public_json():
+    leaves = json.loads((KEYS / "merkle_input.json").read_text())["leaf"]
+    public = json.loads((KEYS / "public.json").read_text())
+    assert public == [str(merkle_root(leaves))]
+
+
+def test_padding_matches_explicit_zero_leaves():
+    assert merkle_root([111, 222, 333]) == merkle_root([111, 222, 333, 0])
+    assert merkle_root([1], depth=3) == merkle_root([1] + [0] * 7, depth=3)
+
+
+def test_leaf_parsing_is_explicit():
+    assert leaf_to_field("111") == 111
+    assert leaf_to_field("0x111") == 0x111
+    assert leaf_to_field("0X0a") == 10
+    assert leaf_to_field(b"\x01\x00") == 256
+    with pytest.raises(ValueError):
+        leaf_to_field("ab12")    # bare hex is ambiguous: prefix it with 0x
+    digest = "0x" + "ff" * 32
+    assert circuit_input([digest], 1) == {
+        "leaf": [str(int(digest, 16) % SNARK_FIELD), "0"], "count": "1"}
@@ -0,0 +1,26 @@
+import json
+
+from github_agent.utils.sessions import SessionLogs
+
+
+def test_window_commits_finalized_sessions(tmp_path):
+    logs = SessionLogs("did:test", root=tmp_path, window=3600)
+    log = logs.open()
+    log.log_text("a", "x")
+    root = logs.close(log)
+    path = logs.seal()
+    logs.shutdown()
+
+    window = json.loads(path.read_text())
+    assert [(s["session"], s["root"], s["leaf_count"])
+            for s in window["sessions"]] == [(log.session, root, 1)]
+
+
+def test_unfinalized_session_is_not_committed(tmp_path):
+    logs = SessionLogs("did:test", root=tmp_path, window=3600, background=True)
+    log = logs.open()
+    log.log_json("x", {"n": 2 ** 60})    # rejected by the canonical form
+    assert logs.close(log) is None
+    assert logs.seal() is None
+    logs.shutdown()
+    assert not (tmp_path / "roots").exists()
@@ -0,0 +1,30 @@
+import time
+
+import pytest
+
+from github_agent.utils.trace_writer import JsonlTraceWriter
+
+
+def test_batch_interval_syncs_an_idle_tail(tmp_path, monkeypatch):
+    synced = []
+    monkeypatch.setattr("os.fsync", lambda fd: synced.append(fd))
+    writer = JsonlTraceWriter(tmp_path, batch_entries=100, batch_interval=0.05)
+    writer.append(b'{"n":0}')      # first line after an idle period: synced
+    for n in range(1, 4):
+        writer.append(b'{"n":%d}' % n)
+    assert writer.synced < writer.lines == 4
+
+    deadline = time.monotonic() + 2
+    while writer.synced < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert writer.synced == 4 and writer.pending == 0
+    writer.close()
+    assert writer.timer is None
+
+
+def test_unknown_durability_is_rejected(tmp_path):
+    pytest.importorskip("zstandard")
+    from github_agent.utils.trace_segments import ZstdTraceWriter
+    with pytest.raises(ValueError, match="durability"):
+        ZstdTraceWriter(tmp_path, durability="alwyas")
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,176 @@
+import json
+import socket
+import struct
+import threading
+from pathlib import Path
+
+import pytest
+
+from github_agent.zk import circuits, prover_client
+from github_agent.zk.cache import Manifest
+from github_agent.zk.circuits import MerkleCircuit, circuit_input, depth_for
+from github_agent.zk.prover_client import ProverClient, ProverError, prove
+
+# Everything here runs without Node: run_tool is replaced by a fake that
+# records each command and writes the files circom/snarkjs would write.
+
+
+def _r1cs(constraints: int = 100) -> bytes:
+    header = (struct.pack("<I", 32) + b"\0" * 32
+              + struct.pack("<IIIIQI", 200, 1, 1, 8, 210, constraints))
+    return (b"r1cs" + struct.pack("<II", 1, 1)
+            + struct.pack("<IQ", 1, len(header)) + header)
+
+
+@pytest.fixture
+def tools(monkeypatch):
+    calls = []
+
+    def run_tool(*cmd):
+        cmd = [str(c) for c in cmd]
+        calls.append(cmd)
+        if cmd[0] == circuits.CIRCOM:
+            out = Path(cmd[cmd.index("-o") + 1])
+            name = Path(cmd[1]).stem
+            (out / f"{name}.r1cs").write_bytes(_r1cs())
+            (out / f"{name}_js").mkdir(exist_ok=True)
+            (out / f"{name}_js" / f"{name}.wasm").write_bytes(b"wasm")
+        elif cmd[1:3] == ["groth16", "setup"]:
+            open(cmd[5], "wb").write(b"zkey 0")
+        elif cmd[1:3] == ["zkey", "contribute"]:
+            open(cmd[4], "wb").write(b"zkey 1")
+        elif cmd[1:3] == ["zkey", "export"]:
+            open(cmd[5], "w").write("{}")
+        elif cmd[1:3] == ["groth16", "prove"]:
+            open(cmd[5], "w").write('{"pi_a": []}')
+            open(cmd[6], "w").write('["1", "2"]')
+
+    monkeypatch.setattr(circuits, "run_tool", run_tool)
+    monkeypatch.setattr(prover_client, "run_tool", run_tool)
+    return calls
+
+
+@pytest.fixture
+def ptau(tmp_path):
+    path = tmp_path / "a.ptau"
+    path.write_bytes(b"ptau a")
+    return path
+
+
+def test_depth_for():
+    assert [depth_for(n) for n in (1, 2, 3, 4, 5, 8, 9)] == [1, 1, 2, 2, 3, 3, 4]
+    with pytest.raises(ValueError):
+        depth_for((1 << circuits.MAX_DEPTH) + 1)
+
+
+def test_circuit_input_pads_with_zeros():
+    assert circuit_input([5, 6, 7]) == {"leaf": ["5", "6", "7", "0"], "count": "3"}
+    assert circuit_input([5], 2)["leaf"] == ["5", "0", "0", "0"]
+    with pytest.raises(ValueError):
+        circuit_input([1, 2, 3], 1)
+
+
+def test_manifest_reruns_only_on_change(tmp_path):
+    src, out = tmp_path / "src", tmp_path / "out"
+    src.write_text("v1")
+    runs = []
+
+    def build(inputs):
+        manifest = Manifest(tmp_path / "manifest.json")
+        with manifest.stage("build", inputs, [out]) as run:
+            if run:
+                runs.append(1)
+                out.write_text("built")
+        return manifest.timings["build"]["cached"]
+
+    assert build({"src": src, "flag": "x"}) is False
+    assert build({"src": src, "flag": "x"}) is True
+    src.write_text("v2")                      # input file changed
+    assert build({"src": src, "flag": "x"}) is False
+    assert build({"src": src, "flag": "y"}) is False   # input value changed
+    out.unlink()                              # output missing
+    assert build({"src": src, "flag": "y"}) is False
+    assert build({"src": src, "flag": "y"}) is True
+    assert len(runs) == 4
+
+
+def test_build_is_cached(tmp_path, tools, ptau):
+    circuit = MerkleCircuit(2, build_dir=tmp_path).build(ptau)
+    assert circuit.zkey.exists() and circuit.vkey.exists()
+    assert json.loads(circuit.meta.read_text())["ptau"] == "a.ptau"
+    first = len(tools)
+
+    again = MerkleCircuit(2, build_dir=tmp_path).build()    # no ptau lookup
+    assert len(tools) == first
+    assert again.manifest.timings == {"compile": {"seconds": 0.0, "cached": True},
+                                      "setup": {"seconds": 0.0, "cached": True}}
+
+
+def test_build_rejects_a_different_ptau(tmp_path, tools, ptau):
+    MerkleCircuit(2, build_dir=tmp_path).build(ptau)
+    other = tmp_path / "b.ptau"
+    other.write_bytes(b"ptau b")
+    circuit = MerkleCircuit(2, build_dir=tmp_path)
+    with pytest.raises(ValueError, match="set up with a.ptau"):
+        circuit.build(other)
+
+    circuit.zkey.unlink()                     # explicit request for a new setup
+    circuit.build(other)
+    assert json.loads(circuit.meta.read_text())["ptau"] == "b.ptau"
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    """Fake prover daemon: answers each JSON-RPC line from `replies`."""
+    path = tmp_path / "prover.sock"
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(str(path))
+    server.listen()
+    replies, requests = [], []
+
+    def serve():
+        while True:
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                return
+            with conn, conn.makefile("rwb") as f:
+                req = json.loads(f.readline())
+                requests.append(req)
+                f.write(json.dumps({"jsonrpc": "2.0", "id": req["id"],
+                                    **replies.pop(0)}).encode() + b"\n")
+
+    threading.Thread(target=serve, daemon=True).start()
+    yield ProverClient(path), replies, requests
+    server.close()
+
+
+def test_prove_uses_the_daemon(tmp_path, tools, daemon):
+    client, replies, requests = daemon
+    replies.append({"result": {"proof": {"pi_a": []}, "publicSignals": ["9", "1"]}})
+    circuit = MerkleCircuit(1, build_dir=tmp_path)
+    assert prove(circuit, {"leaf": ["1", "0"], "count": "1"}, tmp_path / "zk",
+                 client) == "daemon"
+    assert requests[0]["method"] == "prove"
+    assert requests[0]["params"]["zkey"] == str(circuit.zkey.resolve())
+    assert json.loads((tmp_path / "zk" / "public.json").read_text()) == ["9", "1"]
+    assert tools == []
+
+
+def test_prove_reports_daemon_errors(tmp_path, tools, daemon):
+    client, replies, _ = daemon
+    replies.append({"error": {"code": -32000, "message": "bad input"}})
+    with pytest.raises(ProverError, match="bad input"):
+        prove(MerkleCircuit(1, build_dir=tmp_path), {}, tmp_path / "zk", client)
+    assert tools == []
+
+
+def test_prove_falls_back_to_oneshot(tmp_path, tools):
+    client = ProverClient(tmp_path / "no-daemon.sock")
+    circuit = MerkleCircuit(1, build_dir=tmp_path)
+    assert prove(circuit, {"leaf": ["1", "0"], "count": "1"}, tmp_path / "zk",
+                 client) == "oneshot"
+    assert [c[:3] for c in tools] == [["node", str(circuit.witness_js), str(circuit.wasm)],
+                                      [circuits.SNARKJS, "groth16", "prove"]]
+    assert json.loads((tmp_path / "zk" / "input.json").read_text())["count"] == "1"
+    assert json.loads((tmp_path / "zk" / "public.json").read_text()) == ["1", "2"]